@@ -0,0 +1,47 @@
+package com.lalaassistant.app;
+
+import android.util.Log;
+
+import com.chaquo.python.PyObject;
+
+import java.util.concurrent.ConcurrentHashMap;
+
+/**
+ * Routes Android events to the Python AndroidBridge.
+ *
+ * Python registers a single dispatcher per event name. Events without a
+ * subscriber are dropped here, so they never pay the cost of a call into
+ * the Python interpreter.
+ */
+public final class CallbackRouter {
+    private static final String TAG = "CallbackRouter";
+
+    // Event name -> Python dispatcher for that event
+    private static final ConcurrentHashMap<String, PyObject> dispatchers = new ConcurrentHashMap<>();
+
+    private CallbackRouter() {
+    }
+
+    public static void register(String event, PyObject dispatcher) {
+        dispatchers.put(event, dispatcher);
+        Log.d(TAG, "Dispatcher registered for event: " + event);
+    }
+
+    public static void unregister(String event) {
+        dispatchers.remove(event);
+    }
+
+    public static boolean hasSubscribers(String event) {
+        return dispatchers.containsKey(event);
+    }
+
+    public static void fire(String event, Object... args) {
+        PyObject dispatcher = dispatchers.get(event);
+        if (dispatcher == null) {
+            return;
+        }
+
+        // One call into Python; the dispatcher fans out to every callback
+        dispatcher.call(args);
+    }
+}
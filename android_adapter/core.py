@@ -5,16 +5,58 @@ Este módulo proporciona las clases y funciones necesarias para adaptar
 la aplicación Flask a un entorno Android nativo.
 """
 
-import os
+import sys
+import asyncio
 import logging
 import threading
 import json
-from typing import Dict, Any, Optional, List, Callable
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Callable, Set, DefaultDict, Mapping, Sequence, Tuple, ClassVar, NamedTuple
 
-# Configuración de logging
-logging.basicConfig(level=logging.DEBUG)
+# Configuración de logging (el nivel y los handlers los define la aplicación)
 logger = logging.getLogger(__name__)
 
+# Información estática del dispositivo: no cambia durante la vida del proceso.
+# En implementación real: Build.MODEL, Build.VERSION.SDK_INT, etc., leídos una vez.
+_DEVICE_INFO_STATIC: Mapping[str, Any] = MappingProxyType({
+    "model": "Android Emulator",
+    "android_version": "13.0",
+    "sdk_level": 33,
+    "device_id": "emulator-5554",
+    "manufacturer": "Google",
+    "brand": "google",
+    "total_memory": "4GB"
+})
+
+# Permisos de Android, internados para que todas las llamadas compartan el mismo objeto
+PERM_RECORD_AUDIO = sys.intern("android.permission.RECORD_AUDIO")
+PERM_INTERNET = sys.intern("android.permission.INTERNET")
+PERM_POST_NOTIFICATIONS = sys.intern("android.permission.POST_NOTIFICATIONS")
+PERM_MANAGE_EXTERNAL_STORAGE = sys.intern("android.permission.MANAGE_EXTERNAL_STORAGE")
+PERM_READ_EXTERNAL_STORAGE = sys.intern("android.permission.READ_EXTERNAL_STORAGE")
+PERM_WRITE_EXTERNAL_STORAGE = sys.intern("android.permission.WRITE_EXTERNAL_STORAGE")
+
+_VOICE_PERMS = (PERM_RECORD_AUDIO, PERM_INTERNET)
+# Permisos de almacenamiento según versión de Android
+_STORAGE_PERMS_API30 = (PERM_MANAGE_EXTERNAL_STORAGE,)  # Android 11+
+_STORAGE_PERMS_API29 = (PERM_READ_EXTERNAL_STORAGE,)  # Android 10
+_LEGACY_STORAGE_PERMS = (PERM_READ_EXTERNAL_STORAGE, PERM_WRITE_EXTERNAL_STORAGE)  # Android 9 o inferior
+
+# Respuestas simuladas del prototipo
+_SIMULATED_RECOGNIZED = "lala pon una alarma para las 8 de la mañana"
+_SIMULATED_FILE_BYTES = b"contenido simulado"
+
+# Acciones de la notificación del asistente, serializadas una sola vez para
+# cruzar a Java como un único String en lugar de una lista de Map
+_DEFAULT_ACTIONS_JSON = json.dumps([
+    {"title": "Detener", "action": "STOP_ASSISTANT"},
+    {"title": "Configurar", "action": "OPEN_SETTINGS"}
+])
+
 
 class AndroidBridge:
     """
@@ -24,11 +66,40 @@ class AndroidBridge:
     acceder a sensores, permisos y funcionalidades nativas.
     """
     
+    __slots__ = ("_callbacks", "_callback_events", "_is_connected",
+                 "_perm_cache", "_perm_ttl",
+                 "_dynamic_info", "_dynamic_info_at", "_dynamic_info_ttl",
+                 "_exec", "_pending", "_pending_lock",
+                 "_last_toast", "_toast_debounce")
+    
     def __init__(self):
         """Inicializa el puente Android."""
-        self._callbacks = {}
+        self._callbacks: DefaultDict[str, List[Callable]] = defaultdict(list)
+        # Réplica local de los eventos registrados en CallbackRouter (Java),
+        # para consultar suscripciones sin cruzar la frontera JNI
+        self._callback_events: Set[str] = set()
         self._is_connected = False
         
+        # Caché de permisos concedidos: permiso -> instante (monotonic) de la verificación.
+        # Solo se guardan resultados positivos; una denegación se vuelve a consultar.
+        self._perm_cache: Dict[str, float] = {}
+        self._perm_ttl = 60.0
+        
+        # Información dinámica (batería, memoria) con caché de vida corta
+        self._dynamic_info: Dict[str, Any] = {}
+        self._dynamic_info_at = 0.0
+        self._dynamic_info_ttl = 5.0
+        
+        # Las operaciones nativas sin resultado útil (toast, vibración, intents,
+        # servicios) se ejecutan en un hilo propio para no bloquear al llamador
+        self._exec = ThreadPoolExecutor(max_workers=2, thread_name_prefix="android-bridge")
+        self._pending: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+        
+        # Último Toast mostrado (mensaje, instante) para descartar repeticiones
+        self._last_toast = ("", 0.0)
+        self._toast_debounce = 0.2
+        
         # En una implementación real, aquí se inicializaría
         # la conexión con Java/Kotlin a través de Chaquopy o similar
         logger.info("Inicializando puente Android")
@@ -62,11 +133,43 @@ class AndroidBridge:
             event_name: Nombre del evento Android (ej: "onPause", "onResume")
             callback: Función a llamar cuando ocurra el evento
         """
-        if event_name not in self._callbacks:
-            self._callbacks[event_name] = []
+        if event_name not in self._callback_events:
+            # En implementación real: un único despachador por evento en la capa nativa
+            # CallbackRouter.register(event_name, partial(self.dispatch_event, event_name))
+            self._callback_events.add(event_name)
         
         self._callbacks[event_name].append(callback)
-        logger.debug(f"Callback registrado para evento: {event_name}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Callback registrado para evento: %s", event_name)
+    
+    def has_callbacks(self, event_name: str) -> bool:
+        """
+        Indica si hay callbacks registrados para un evento.
+        
+        Args:
+            event_name: Nombre del evento Android
+            
+        Returns:
+            bool: True si el evento tiene suscriptores
+        """
+        return event_name in self._callback_events
+    
+    def dispatch_event(self, event_name: str, *args: Any) -> None:
+        """
+        Ejecuta los callbacks de un evento.
+        
+        CallbackRouter lo invoca una sola vez por evento, y solo para
+        eventos con suscriptores.
+        
+        Args:
+            event_name: Nombre del evento Android
+            *args: Argumentos del evento
+        """
+        for callback in self._callbacks.get(event_name, ()):
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error("Error en callback de %s: %s", event_name, e)
     
     def request_permission(self, permission: str) -> bool:
         """
@@ -79,8 +182,16 @@ class AndroidBridge:
             bool: True si el permiso fue otorgado, False si no
         """
         # En una implementación real: solicitar permiso al sistema Android
-        logger.info(f"Solicitando permiso: {permission}")
-        return True
+        logger.info("Solicitando permiso: %s", permission)
+        granted = True
+        
+        # Actualizar caché con el nuevo estado del permiso
+        if granted:
+            self._perm_cache[permission] = time.monotonic()
+        else:
+            self._perm_cache.pop(permission, None)
+        
+        return granted
     
     def check_permission(self, permission: str) -> bool:
         """
@@ -92,9 +203,123 @@ class AndroidBridge:
         Returns:
             bool: True si el permiso está concedido, False si no
         """
-        # En implementación real: verificar permiso en Android
-        logger.info(f"Verificando permiso: {permission}")
-        return True
+        now = time.monotonic()
+        checked_at = self._perm_cache.get(permission)
+        if checked_at is not None and now - checked_at < self._perm_ttl:
+            return True
+        
+        # En implementación real: verificar permiso en Android (llamada JNI)
+        logger.info("Verificando permiso: %s", permission)
+        granted = True
+        
+        if granted:
+            self._perm_cache[permission] = now
+        
+        return granted
+    
+    def check_permissions(self, permissions: Sequence[str]) -> Dict[str, bool]:
+        """
+        Verifica varios permisos con una sola llamada a la capa nativa.
+        
+        Args:
+            permissions: Lista de permisos a verificar
+            
+        Returns:
+            Dict[str, bool]: Estado de cada permiso
+        """
+        now = time.monotonic()
+        results = {}
+        pending = []
+        
+        for permission in permissions:
+            checked_at = self._perm_cache.get(permission)
+            if checked_at is not None and now - checked_at < self._perm_ttl:
+                results[permission] = True
+            else:
+                pending.append(permission)
+        
+        if pending:
+            # En implementación real: un único helper Java que recorre un String[]
+            # llamando a ContextCompat.checkSelfPermission
+            logger.info("Verificando permisos: %s", pending)
+            for permission in pending:
+                granted = True
+                results[permission] = granted
+                if granted:
+                    self._perm_cache[permission] = now
+        
+        return results
+    
+    def request_permissions(self, permissions: Sequence[str]) -> Dict[str, bool]:
+        """
+        Solicita varios permisos de Android en una sola petición.
+        
+        Args:
+            permissions: Lista de permisos a solicitar
+            
+        Returns:
+            Dict[str, bool]: True para cada permiso otorgado, False si no
+        """
+        # En implementación real: ActivityCompat.requestPermissions(activity, String[], code)
+        logger.info("Solicitando permisos: %s", permissions)
+        now = time.monotonic()
+        results = {}
+        
+        for permission in permissions:
+            granted = True
+            results[permission] = granted
+            if granted:
+                self._perm_cache[permission] = now
+            else:
+                self._perm_cache.pop(permission, None)
+        
+        return results
+    
+    def _submit(self, fn: Callable, *args: Any) -> Future:
+        """
+        Encola una operación nativa en el ejecutor del puente.
+        
+        Args:
+            fn: Función a ejecutar
+            *args: Argumentos de la función
+            
+        Returns:
+            Future: Resultado diferido de la operación
+        """
+        future = self._exec.submit(fn, *args)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_task_done)
+        return future
+    
+    def _on_task_done(self, future: Future) -> None:
+        """Retira una operación terminada y registra su error, si lo hubo."""
+        with self._pending_lock:
+            self._pending.discard(future)
+        
+        # Una operación cancelada (p. ej. al cerrar el executor) no tiene error que leer
+        if future.cancelled():
+            return
+        
+        error = future.exception()
+        if error is not None:
+            logger.error("Error en operación nativa: %s", error)
+    
+    def await_all(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que terminen las operaciones nativas pendientes.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos (None para esperar siempre)
+            
+        Returns:
+            bool: True si todas las operaciones terminaron
+        """
+        with self._pending_lock:
+            pending = list(self._pending)
+        
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
     
     def start_background_service(self, service_name: str) -> bool:
         """
@@ -104,11 +329,15 @@ class AndroidBridge:
             service_name: Nombre del servicio a iniciar
             
         Returns:
-            bool: True si el servicio se inició correctamente
+            bool: True si la solicitud de inicio se encoló correctamente
         """
-        logger.info(f"Iniciando servicio en segundo plano: {service_name}")
+        self._submit(self._start_background_service, service_name)
         return True
     
+    def _start_background_service(self, service_name: str) -> None:
+        # En implementación real: startForegroundService vía JNI
+        logger.info("Iniciando servicio en segundo plano: %s", service_name)
+    
     def stop_background_service(self, service_name: str) -> bool:
         """
         Detiene un servicio en segundo plano.
@@ -117,11 +346,44 @@ class AndroidBridge:
             service_name: Nombre del servicio a detener
             
         Returns:
-            bool: True si el servicio se detuvo correctamente
+            bool: True si la solicitud de detención se encoló correctamente
         """
-        logger.info(f"Deteniendo servicio en segundo plano: {service_name}")
+        self._submit(self._stop_background_service, service_name)
         return True
     
+    def _stop_background_service(self, service_name: str) -> None:
+        # En implementación real: stopService vía JNI
+        logger.info("Deteniendo servicio en segundo plano: %s", service_name)
+    
+    @property
+    def sdk_level(self) -> int:
+        """
+        Nivel de API de Android del dispositivo.
+        
+        Returns:
+            int: Valor de Build.VERSION.SDK_INT
+        """
+        return _DEVICE_INFO_STATIC["sdk_level"]
+    
+    def _get_dynamic_info(self) -> Dict[str, Any]:
+        """
+        Obtiene la información variable del dispositivo (batería, memoria).
+        
+        Returns:
+            Dict: Campos dinámicos, reutilizados durante unos segundos
+        """
+        now = time.monotonic()
+        if now - self._dynamic_info_at >= self._dynamic_info_ttl:
+            # En implementación real: consultar BatteryManager y ActivityManager
+            self._dynamic_info = {
+                "battery_level": 100,
+                "is_charging": True,
+                "available_memory": "2GB"
+            }
+            self._dynamic_info_at = now
+        
+        return self._dynamic_info
+    
     def get_device_info(self) -> Dict[str, Any]:
         """
         Obtiene información del dispositivo Android.
@@ -129,19 +391,7 @@ class AndroidBridge:
         Returns:
             Dict: Información del dispositivo (modelo, versión, etc.)
         """
-        # En implementación real: obtener información real del dispositivo
-        return {
-            "model": "Android Emulator",
-            "android_version": "13.0",
-            "sdk_level": 33,
-            "device_id": "emulator-5554",
-            "manufacturer": "Google",
-            "brand": "google",
-            "battery_level": 100,
-            "is_charging": True,
-            "total_memory": "4GB",
-            "available_memory": "2GB"
-        }
+        return {**_DEVICE_INFO_STATIC, **self._get_dynamic_info()}
     
     def vibrate(self, duration_ms: int = 500) -> None:
         """
@@ -150,7 +400,11 @@ class AndroidBridge:
         Args:
             duration_ms: Duración de la vibración en milisegundos
         """
-        logger.info(f"Vibrando dispositivo por {duration_ms}ms")
+        self._submit(self._vibrate, duration_ms)
+    
+    def _vibrate(self, duration_ms: int) -> None:
+        # En implementación real: Vibrator.vibrate vía JNI
+        logger.info("Vibrando dispositivo por %sms", duration_ms)
     
     def show_toast(self, message: str, long_duration: bool = False) -> None:
         """
@@ -160,8 +414,56 @@ class AndroidBridge:
             message: Mensaje a mostrar
             long_duration: Si es True, muestra el mensaje por más tiempo
         """
+        if self._toast_debounced(message):
+            return
+        
+        self._submit(self._show_toast, message, long_duration)
+    
+    def _toast_debounced(self, message: str) -> bool:
+        """
+        Indica si un Toast repite el anterior dentro de la ventana de debounce.
+        
+        Args:
+            message: Mensaje que se quiere mostrar
+            
+        Returns:
+            bool: True si el mensaje debe descartarse
+        """
+        now = time.monotonic()
+        last_message, last_at = self._last_toast
+        if message == last_message and now - last_at < self._toast_debounce:
+            return True
+        self._last_toast = (message, now)
+        return False
+    
+    def _show_toast(self, message: str, long_duration: bool) -> None:
+        # En implementación real: una sola llamada JNI a LalaBridge.notify(message, longDur),
+        # que escribe en Log y muestra el Toast
         duration = "LONG" if long_duration else "SHORT"
-        logger.info(f"Mostrando Toast ({duration}): {message}")
+        logger.info("Mostrando Toast (%s): %s", duration, message)
+    
+    def feedback(self, vibrate_ms: int = 0, toast: Optional[str] = None,
+               long_duration: bool = False) -> None:
+        """
+        Vibra y muestra un Toast con una sola operación nativa.
+        
+        Args:
+            vibrate_ms: Duración de la vibración en milisegundos (0 para no vibrar)
+            toast: Mensaje a mostrar (None para no mostrar Toast)
+            long_duration: Si es True, muestra el mensaje por más tiempo
+        """
+        if toast is not None and self._toast_debounced(toast):
+            toast = None
+        
+        if vibrate_ms or toast is not None:
+            self._submit(self._feedback, vibrate_ms, toast, long_duration)
+    
+    def _feedback(self, vibrate_ms: int, toast: Optional[str], long_duration: bool) -> None:
+        # En implementación real: una sola llamada JNI a LalaBridge.feedback(ms, message, longDur)
+        if vibrate_ms:
+            self._vibrate(vibrate_ms)
+        if toast is not None:
+            self._show_toast(toast, long_duration)
     
     def launch_intent(self, action: str, data: Optional[str] = None, 
                     package: Optional[str] = None) -> bool:
@@ -174,10 +476,14 @@ class AndroidBridge:
             package: Nombre del paquete (opcional)
             
         Returns:
-            bool: True si el Intent se lanzó correctamente
+            bool: True si el Intent se encoló correctamente
         """
-        logger.info(f"Lanzando Intent: action={action}, data={data}, package={package}")
+        self._submit(self._launch_intent, action, data, package)
         return True
+    
+    def _launch_intent(self, action: str, data: Optional[str], package: Optional[str]) -> None:
+        # En implementación real: Context.startActivity vía JNI
+        logger.info("Lanzando Intent: action=%s, data=%s, package=%s", action, data, package)
 
 
 class VoiceRecognitionService:
@@ -188,6 +494,9 @@ class VoiceRecognitionService:
     así como implementaciones alternativas offline usando Vosk.
     """
     
+    __slots__ = ("bridge", "prefer_offline", "_is_listening", "_offline_model_loaded",
+                 "_loop", "_results", "_listen_task")
+    
     def __init__(self, bridge: AndroidBridge, prefer_offline: bool = False):
         """
         Inicializa el servicio de reconocimiento de voz.
@@ -198,9 +507,15 @@ class VoiceRecognitionService:
         """
         self.bridge = bridge
         self.prefer_offline = prefer_offline
-        self._is_listening = False
+        # threading.Event: stop_listening/is_listening se llaman desde otros hilos
+        self._is_listening = threading.Event()
         self._offline_model_loaded = False
         
+        # Bucle asyncio y cola de resultados de la escucha activa
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._results: Optional[asyncio.Queue] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        
         # Verificar permisos necesarios
         self._check_permissions()
     
@@ -211,48 +526,76 @@ class VoiceRecognitionService:
         Returns:
             bool: True si todos los permisos están otorgados
         """
-        permissions = [
-            "android.permission.RECORD_AUDIO",
-            "android.permission.INTERNET"
-        ]
+        results = self.bridge.check_permissions(_VOICE_PERMS)
+        missing = [p for p, ok in results.items() if not ok]
+        if not missing:
+            return True
         
-        all_granted = True
-        for permission in permissions:
-            if not self.bridge.check_permission(permission):
-                granted = self.bridge.request_permission(permission)
-                all_granted = all_granted and granted
-                
-                if not granted:
-                    logger.warning(f"Permiso no otorgado: {permission}")
+        granted = self.bridge.request_permissions(missing)
+        for permission in missing:
+            if not granted[permission]:
+                logger.warning("Permiso no otorgado: %s", permission)
         
-        return all_granted
+        return all(granted.values())
     
-    def start_listening(self, callback: Callable[[str], None]) -> bool:
+    async def start_listening(self, callback: Callable[[str], None]) -> bool:
         """
         Inicia escucha continua para comandos de voz.
         
+        Debe llamarse desde un bucle asyncio; los resultados se entregan a
+        callback desde ese mismo bucle.
+        
         Args:
             callback: Función a llamar cuando se reconozca un comando
             
         Returns:
             bool: True si se inició correctamente la escucha
         """
-        if self._is_listening:
+        if self._is_listening.is_set():
             logger.warning("El reconocimiento de voz ya está activo")
             return False
         
         logger.info("Iniciando reconocimiento de voz continuo")
-        self._is_listening = True
-        
-        # En una implementación real, se iniciaría un hilo para
-        # escuchar continuamente o se usaría el servicio nativo de Android
+        self._loop = asyncio.get_running_loop()
+        self._results = asyncio.Queue()
+        self._is_listening.set()
         
         # Simulamos actividad para este prototipo
         self.bridge.show_toast("Escuchando comandos de voz...")
         
-        # En una implementación real: iniciar servicio nativo o Vosk
+        # En una implementación real: iniciar servicio nativo o Vosk, que
+        # entregará cada resultado mediante deliver_result()
+        self._listen_task = asyncio.create_task(self._listen_loop(callback))
         return True
     
+    async def _listen_loop(self, callback: Callable[[str], None]) -> None:
+        """
+        Entrega los resultados reconocidos al callback sin sondeo activo.
+        
+        Args:
+            callback: Función a llamar con cada texto reconocido
+        """
+        while self._is_listening.is_set():
+            text = await self._results.get()
+            if text is None:
+                break
+            
+            try:
+                callback(text)
+            except Exception as e:
+                logger.error("Error en callback de reconocimiento: %s", e)
+    
+    def deliver_result(self, text: str) -> None:
+        """
+        Recibe un texto reconocido desde el hilo nativo (JNI) del reconocedor.
+        
+        Args:
+            text: Texto reconocido
+        """
+        loop = self._loop
+        if loop is not None and self._is_listening.is_set():
+            loop.call_soon_threadsafe(self._results.put_nowait, text)
+    
     def stop_listening(self) -> bool:
         """
         Detiene la escucha de comandos de voz.
@@ -260,12 +603,17 @@ class VoiceRecognitionService:
         Returns:
             bool: True si se detuvo correctamente
         """
-        if not self._is_listening:
+        if not self._is_listening.is_set():
             logger.warning("El reconocimiento de voz no está activo")
             return False
         
         logger.info("Deteniendo reconocimiento de voz")
-        self._is_listening = False
+        self._is_listening.clear()
+        
+        # Despertar el bucle de escucha para que termine
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._results.put_nowait, None)
+        self._loop = None
         
         # En implementación real: detener servicios de reconocimiento
         self.bridge.show_toast("Reconocimiento de voz detenido")
@@ -279,7 +627,7 @@ class VoiceRecognitionService:
         Returns:
             bool: Estado de escucha
         """
-        return self._is_listening
+        return self._is_listening.is_set()
     
     def load_offline_model(self, model_path: str) -> bool:
         """
@@ -291,7 +639,7 @@ class VoiceRecognitionService:
         Returns:
             bool: True si el modelo se cargó correctamente
         """
-        logger.info(f"Cargando modelo offline desde: {model_path}")
+        logger.info("Cargando modelo offline desde: %s", model_path)
         
         # En implementación real: cargar modelo Vosk
         # from vosk import Model
@@ -312,7 +660,7 @@ class VoiceRecognitionService:
         Returns:
             str: Texto reconocido o cadena vacía si no se reconoció nada
         """
-        logger.info(f"Iniciando reconocimiento único (máx {max_duration_sec}s)")
+        logger.info("Iniciando reconocimiento único (máx %ss)", max_duration_sec)
         
         # En implementación real: usar SpeechRecognizer de Android o Vosk
         
@@ -320,9 +668,9 @@ class VoiceRecognitionService:
         self.bridge.show_toast("Escuchando...")
         
         # Texto simulado de reconocimiento
-        recognized_text = "lala pon una alarma para las 8 de la mañana"
+        recognized_text = _SIMULATED_RECOGNIZED
         
-        logger.info(f"Texto reconocido: '{recognized_text}'")
+        logger.info("Texto reconocido: '%s'", recognized_text)
         return recognized_text
 
 
@@ -334,6 +682,8 @@ class TextToSpeechService:
     así como implementaciones alternativas offline usando Coqui TTS.
     """
     
+    __slots__ = ("bridge", "prefer_offline", "_offline_model_loaded")
+    
     def __init__(self, bridge: AndroidBridge, prefer_offline: bool = False):
         """
         Inicializa el servicio de síntesis de voz.
@@ -363,7 +713,7 @@ class TextToSpeechService:
         Returns:
             bool: True si la síntesis se inició correctamente
         """
-        logger.info(f"Sintetizando texto: '{text}' (lang={language}, rate={rate}, pitch={pitch})")
+        logger.info("Sintetizando texto: '%s' (lang=%s, rate=%s, pitch=%s)", text, language, rate, pitch)
         
         # En implementación real: usar TextToSpeech de Android o Coqui TTS
         
@@ -382,7 +732,7 @@ class TextToSpeechService:
         Returns:
             bool: True si el modelo se cargó correctamente
         """
-        logger.info(f"Cargando modelo TTS offline desde: {model_path}")
+        logger.info("Cargando modelo TTS offline desde: %s", model_path)
         
         # En implementación real: cargar modelo Coqui TTS
         
@@ -423,6 +773,11 @@ class NotificationService:
     en el sistema Android.
     """
     
+    __slots__ = ("bridge",)
+    
+    # Canales ya creados en el proceso, compartidos por todas las instancias
+    _created_channels: ClassVar[Set[str]] = set()
+    
     def __init__(self, bridge: AndroidBridge):
         """
         Inicializa el servicio de notificaciones.
@@ -431,7 +786,6 @@ class NotificationService:
             bridge: Puente Android para acceso a funciones nativas
         """
         self.bridge = bridge
-        self._notification_channel_created = False
         
         # Verificar permisos necesarios
         self._check_permissions()
@@ -444,9 +798,9 @@ class NotificationService:
             bool: True si todos los permisos están otorgados
         """
         # Para Android 13+, se necesita permiso explícito
-        if self.bridge.get_device_info().get("sdk_level", 0) >= 33:
-            return self.bridge.check_permission("android.permission.POST_NOTIFICATIONS") or \
-                   self.bridge.request_permission("android.permission.POST_NOTIFICATIONS")
+        if self.bridge.sdk_level >= 33:
+            return self.bridge.check_permission(PERM_POST_NOTIFICATIONS) or \
+                   self.bridge.request_permission(PERM_POST_NOTIFICATIONS)
         
         return True
     
@@ -465,11 +819,11 @@ class NotificationService:
         Returns:
             bool: True si el canal se creó correctamente
         """
-        logger.info(f"Creando canal de notificaciones: {channel_id} ({name})")
+        logger.info("Creando canal de notificaciones: %s (%s)", channel_id, name)
         
         # En implementación real: crear NotificationChannel en Android
         
-        self._notification_channel_created = True
+        NotificationService._created_channels.add(channel_id)
         return True
     
     def show_notification(self, 
@@ -478,7 +832,9 @@ class NotificationService:
                        notification_id: int = 1,
                        channel_id: str = "lala_assistant",
                        ongoing: bool = False,
-                       actions: Optional[List[Dict[str, str]]] = None) -> bool:
+                       actions: Optional[List[Dict[str, str]]] = None,
+                       actions_json: Optional[str] = None,
+                       vibrate_ms: int = 0) -> bool:
         """
         Muestra una notificación en Android.
         
@@ -489,20 +845,28 @@ class NotificationService:
             channel_id: ID del canal de notificaciones
             ongoing: Si es True, la notificación no se puede descartar
             actions: Lista de acciones (botones) para la notificación
+            actions_json: Acciones ya serializadas en JSON (tiene prioridad sobre actions)
+            vibrate_ms: Vibración que acompaña a la notificación, en milisegundos
             
         Returns:
             bool: True si la notificación se mostró correctamente
         """
         # Crear canal si no existe
-        if not self._notification_channel_created:
+        if channel_id not in NotificationService._created_channels:
             self.create_notification_channel(channel_id)
         
-        logger.info(f"Mostrando notificación: '{title}' (id={notification_id})")
+        logger.info("Mostrando notificación: '%s' (id=%s)", title, notification_id)
+        
+        # Las acciones viajan a Java como un único String JSON
+        if actions_json is None and actions:
+            actions_json = json.dumps(actions)
         
-        # En implementación real: crear y mostrar Notification en Android
+        # En implementación real: crear y mostrar Notification en Android,
+        # pasando actions_json para que Java lo deserialice una vez y
+        # vibrate_ms al patrón de vibración de la propia notificación
         
         # Simulación para prototipo
-        self.bridge.show_toast(f"Notificación: {title} - {message}")
+        self.bridge.feedback(vibrate_ms, f"Notificación: {title} - {message}")
         
         return True
     
@@ -516,7 +880,7 @@ class NotificationService:
         Returns:
             bool: True si la notificación se canceló correctamente
         """
-        logger.info(f"Cancelando notificación con ID: {notification_id}")
+        logger.info("Cancelando notificación con ID: %s", notification_id)
         
         # En implementación real: cancelar Notification en Android
         
@@ -544,6 +908,8 @@ class StorageService:
     interno y externo de Android, así como preferencias compartidas.
     """
     
+    __slots__ = ("bridge", "_permissions")
+    
     def __init__(self, bridge: AndroidBridge):
         """
         Inicializa el servicio de almacenamiento.
@@ -553,9 +919,30 @@ class StorageService:
         """
         self.bridge = bridge
         
+        # El nivel de API no cambia: elegir una sola vez los permisos necesarios
+        self._permissions = self._permissions_for_sdk(bridge.sdk_level)
+        
         # Verificar permisos si se necesita acceso a almacenamiento externo
         self._check_permissions()
     
+    @staticmethod
+    def _permissions_for_sdk(sdk_level: int) -> Tuple[str, ...]:
+        """
+        Selecciona los permisos de almacenamiento para un nivel de API.
+        
+        Args:
+            sdk_level: Nivel de API de Android
+            
+        Returns:
+            Tuple[str, ...]: Permisos requeridos
+        """
+        # Permisos para Android 10+ son diferentes que para versiones anteriores
+        if sdk_level >= 30:
+            return _STORAGE_PERMS_API30
+        elif sdk_level >= 29:
+            return _STORAGE_PERMS_API29
+        return _LEGACY_STORAGE_PERMS
+    
     def _check_permissions(self) -> bool:
         """
         Verifica y solicita permisos necesarios para almacenamiento.
@@ -563,28 +950,10 @@ class StorageService:
         Returns:
             bool: True si todos los permisos están otorgados
         """
-        # Permisos para Android 10+ son diferentes que para versiones anteriores
-        sdk_level = self.bridge.get_device_info().get("sdk_level", 0)
-        
-        if sdk_level >= 30:  # Android 11+
-            return self.bridge.check_permission("android.permission.MANAGE_EXTERNAL_STORAGE") or \
-                   self.bridge.request_permission("android.permission.MANAGE_EXTERNAL_STORAGE")
-        elif sdk_level >= 29:  # Android 10
-            return self.bridge.check_permission("android.permission.READ_EXTERNAL_STORAGE") or \
-                   self.bridge.request_permission("android.permission.READ_EXTERNAL_STORAGE")
-        else:  # Android 9 o inferior
-            permissions = [
-                "android.permission.READ_EXTERNAL_STORAGE",
-                "android.permission.WRITE_EXTERNAL_STORAGE"
-            ]
-            
-            all_granted = True
-            for permission in permissions:
-                if not self.bridge.check_permission(permission):
-                    granted = self.bridge.request_permission(permission)
-                    all_granted = all_granted and granted
-            
-            return all_granted
+        results = self.bridge.check_permissions(self._permissions)
+        missing = [p for p, ok in results.items() if not ok]
+        
+        return not missing or all(self.bridge.request_permissions(missing).values())
     
     def save_preferences(self, key: str, value: Any) -> bool:
         """
@@ -597,7 +966,7 @@ class StorageService:
         Returns:
             bool: True si se guardó correctamente
         """
-        logger.info(f"Guardando preferencia: {key}")
+        logger.info("Guardando preferencia: %s", key)
         
         # En implementación real: usar SharedPreferences de Android
         
@@ -614,7 +983,7 @@ class StorageService:
         Returns:
             Any: Valor guardado o valor por defecto
         """
-        logger.info(f"Obteniendo preferencia: {key}")
+        logger.info("Obteniendo preferencia: %s", key)
         
         # En implementación real: usar SharedPreferences de Android
         
@@ -633,7 +1002,7 @@ class StorageService:
             bool: True si se guardó correctamente
         """
         location = "externo" if external else "interno"
-        logger.info(f"Guardando archivo '{file_name}' en almacenamiento {location}")
+        logger.info("Guardando archivo '%s' en almacenamiento %s", file_name, location)
         
         # En implementación real: usar File y FileOutputStream de Android
         
@@ -651,12 +1020,24 @@ class StorageService:
             Optional[bytes]: Datos leídos o None si el archivo no existe
         """
         location = "externo" if external else "interno"
-        logger.info(f"Leyendo archivo '{file_name}' de almacenamiento {location}")
+        logger.info("Leyendo archivo '%s' de almacenamiento %s", file_name, location)
         
         # En implementación real: usar File y FileInputStream de Android
         
         # Simulación para prototipo
-        return b"contenido simulado"
+        return _SIMULATED_FILE_BYTES
+
+
+class DeviceStatus(NamedTuple):
+    """Estado del dispositivo y de los servicios del adaptador."""
+    
+    device: Dict[str, Any]
+    voice_active: bool
+    tts_active: bool
+    background_service: bool
+    battery_level: int
+    is_charging: bool
+    available_memory: str
 
 
 # Clase principal para inicializar todo el adaptador Android
@@ -668,6 +1049,9 @@ class AndroidAdapter:
     para integrar la aplicación Python con la plataforma Android.
     """
     
+    # __dict__ se mantiene para las propiedades cacheadas de los servicios
+    __slots__ = ("bridge", "__dict__")
+    
     def __init__(self):
         """Inicializa el adaptador Android y todos sus servicios."""
         logger.info("Inicializando adaptador Android para Lala")
@@ -678,13 +1062,29 @@ class AndroidAdapter:
             logger.error("No se pudo conectar con la plataforma Android")
             return
         
-        # Inicializar servicios
-        self.voice_recognition = VoiceRecognitionService(self.bridge)
-        self.text_to_speech = TextToSpeechService(self.bridge)
-        self.notifications = NotificationService(self.bridge)
-        self.storage = StorageService(self.bridge)
-        
+        # Los servicios se crean bajo demanda (ver propiedades siguientes)
+        # para no verificar permisos durante el arranque de la aplicación
         logger.info("Adaptador Android inicializado correctamente")
+        
+    @cached_property
+    def voice_recognition(self) -> VoiceRecognitionService:
+        """Servicio de reconocimiento de voz, creado en el primer uso."""
+        return VoiceRecognitionService(self.bridge)
+    
+    @cached_property
+    def text_to_speech(self) -> TextToSpeechService:
+        """Servicio de síntesis de voz, creado en el primer uso."""
+        return TextToSpeechService(self.bridge)
+    
+    @cached_property
+    def notifications(self) -> NotificationService:
+        """Servicio de notificaciones, creado en el primer uso."""
+        return NotificationService(self.bridge)
+    
+    @cached_property
+    def storage(self) -> StorageService:
+        """Servicio de almacenamiento, creado en el primer uso."""
+        return StorageService(self.bridge)
     
     def start_background_assistant(self) -> bool:
         """
@@ -701,10 +1101,7 @@ class AndroidAdapter:
             message="Escuchando comandos de voz",
             notification_id=1001,
             ongoing=True,
-            actions=[
-                {"title": "Detener", "action": "STOP_ASSISTANT"},
-                {"title": "Configurar", "action": "OPEN_SETTINGS"}
-            ]
+            actions_json=_DEFAULT_ACTIONS_JSON
         )
         
         # Iniciar servicio en segundo plano
@@ -725,30 +1122,77 @@ class AndroidAdapter:
         # Detener servicio en segundo plano
         return self.bridge.stop_background_service("lala.assistant.BackgroundService")
     
-    def get_device_status(self) -> Dict[str, Any]:
+    def get_device_status(self) -> DeviceStatus:
         """
         Obtiene estado actual del dispositivo.
         
         Returns:
-            Dict: Información del dispositivo y estado de servicios
+            DeviceStatus: Información del dispositivo y estado de servicios
         """
         device_info = self.bridge.get_device_info()
         
-        return {
-            "device": device_info,
-            "voice_active": self.voice_recognition.is_listening(),
-            "tts_active": self.text_to_speech.is_speaking(),
-            "background_service": True,  # En implementación real: verificar estado del servicio
-            "battery_level": device_info.get("battery_level", 0),
-            "is_charging": device_info.get("is_charging", False),
-            "available_memory": device_info.get("available_memory", "Unknown")
-        }
+        # Un servicio que aún no se ha creado no puede estar activo
+        voice_active = "voice_recognition" in self.__dict__ and self.voice_recognition.is_listening()
+        tts_active = "text_to_speech" in self.__dict__ and self.text_to_speech.is_speaking()
+        
+        return DeviceStatus(
+            device_info,
+            voice_active,
+            tts_active,
+            True,  # En implementación real: verificar estado del servicio
+            device_info["battery_level"],
+            device_info["is_charging"],
+            device_info["available_memory"]
+        )
+
+
+class LazyProxy:
+    """
+    Proxy que crea el objeto real en el primer acceso a uno de sus atributos.
+    
+    Permite mantener instancias globales de módulo con la misma API sin
+    pagar su construcción (carga de modelos, etc.) al importar el módulo.
+    """
+    
+    __slots__ = ("_lazy_factory", "_lazy_obj", "_lazy_lock")
+    
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        Inicializa el proxy sin crear el objeto.
+        
+        Args:
+            factory: Función que crea el objeto real
+        """
+        object.__setattr__(self, "_lazy_factory", factory)
+        object.__setattr__(self, "_lazy_obj", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+    
+    def _lazy_get(self) -> Any:
+        """Devuelve el objeto real, creándolo una sola vez aunque haya varios hilos."""
+        obj = self._lazy_obj
+        if obj is None:
+            with self._lazy_lock:
+                obj = self._lazy_obj
+                if obj is None:
+                    obj = self._lazy_factory()
+                    object.__setattr__(self, "_lazy_obj", obj)
+        return obj
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_get(), name)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._lazy_get(), name, value)
 
 
 # Función de conveniencia para obtener una instancia del adaptador
+@lru_cache(maxsize=1)
 def get_android_adapter() -> AndroidAdapter:
     """
-    Obtiene una instancia del adaptador Android.
+    Obtiene la instancia del adaptador Android compartida por todo el proceso.
+    
+    El adaptador (y su puente) se crea en la primera llamada; las siguientes
+    reutilizan la misma instancia.
     
     Returns:
         AndroidAdapter: Instancia del adaptador
@@ -5,26 +5,118 @@ Este módulo integra todos los componentes de Lala (agente planner, servicios AI
 para crear una API coherente que puede utilizarse desde una aplicación Android.
 """
 
-import os
+import re
 import sys
-import json
+import queue
 import logging
 import threading
 import time
-from typing import Dict, Any, Optional, List, Callable, Tuple, Union
+import functools
+import importlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Callable, Tuple, Union, Deque
 
-# Importar componentes de Lala
+if TYPE_CHECKING:
+    import numpy as np
+
+# Importar componentes de Lala. Los servicios (planner, router de modelos,
+# NLP, optimizador) cargan modelos al importarse: se importan en el primer
+# uso para no bloquear el arranque de la aplicación Android
 from .core import AndroidAdapter, get_android_adapter
-from services.agent_planner import agent_planner, process_agent_command
-from services.ai_models_router import ai_router, process_ai_request
-from services.nlp import process_command
-from services.model_optimizer import optimizer, get_optimal_models_config
 from utils import is_online
 
-# Configuración de logging
-logging.basicConfig(level=logging.DEBUG)
+# Servicios accesibles como atributos del módulo (nombre -> módulo que lo define)
+_LAZY_SERVICES = {
+    "agent_planner": "services.agent_planner",
+    "process_agent_command": "services.agent_planner",
+    "ai_router": "services.ai_models_router",
+    "process_ai_request": "services.ai_models_router",
+    "nlp_processor": "services.minilm_nlp",
+    "optimizer": "services.model_optimizer",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Importa bajo demanda los servicios de Lala expuestos por este módulo.
+    
+    Args:
+        name: Nombre del atributo solicitado
+        
+    Returns:
+        Any: Objeto del servicio
+    """
+    module_name = _LAZY_SERVICES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # Las siguientes consultas ya no pasan por aquí
+    return value
+
+
+@functools.lru_cache(maxsize=8)
+def get_optimal_models_config(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Obtiene la configuración óptima de modelos, memorizada por argumentos.
+    
+    Recorre los ficheros de modelos y solo depende de model_size_mb, así que
+    se guarda su resultado (cache_clear() al cambiar preferencias).
+    
+    Returns:
+        Dict[str, Any]: Configuración de services.model_optimizer
+    """
+    from services.model_optimizer import get_optimal_models_config as _get_optimal_models_config
+    return _get_optimal_models_config(*args, **kwargs)
+
+# Logging del módulo (la aplicación que lo usa configura los handlers y el nivel)
 logger = logging.getLogger(__name__)
 
+# Caché del estado de conexión: is_online() puede hacer una sonda de red
+_ONLINE_CACHE = {"t": float("-inf"), "v": False}
+_ONLINE_LOCK = threading.Lock()
+
+
+# Caché de respuestas del asistente
+_RESPONSE_CACHE_SIZE = 256  # Entradas por coincidencia exacta
+_SEMANTIC_CACHE_SIZE = 32  # Entradas comparadas por similitud de embeddings
+_SEMANTIC_THRESHOLD = 0.92  # Similitud coseno mínima para reutilizar una respuesta
+
+# Prompt de sistema común a todas las peticiones: al ser siempre el mismo
+# prefijo, los proveedores que cachean prompts pueden reutilizarlo
+_LALA_SYSTEM_PROMPT = (
+    "Eres Lala, un asistente de voz amable y servicial. "
+    "Responde de forma concisa y natural."
+)
+
+# Servicios de IA cuya disponibilidad se informa en la configuración
+_API_SERVICES = ("openai", "anthropic", "gemini", "grok")
+
+# Comandos detectados en segundo plano pendientes de entregar al callback
+_EVENT_QUEUE_SIZE = 8
+
+
+def _cached_is_online(ttl: float = 5.0) -> bool:
+    """
+    Devuelve is_online() reutilizando el último resultado durante ttl segundos.
+    
+    Args:
+        ttl: Vida del resultado en caché, en segundos
+        
+    Returns:
+        bool: True si hay conexión a internet
+    """
+    with _ONLINE_LOCK:
+        now = time.monotonic()
+        if now - _ONLINE_CACHE["t"] < ttl:
+            return _ONLINE_CACHE["v"]
+        
+        value = is_online()
+        _ONLINE_CACHE["t"] = now
+        _ONLINE_CACHE["v"] = value
+        return value
+
 
 class LalaAssistant:
     """
@@ -51,6 +143,7 @@ class LalaAssistant:
         self.user_id = user_id
         self.prefer_offline = prefer_offline
         self.wake_word = wake_word
+        self._wake_re = re.compile(re.escape(wake_word), re.IGNORECASE)
         
         # Inicializar adaptador Android
         self.android = get_android_adapter()
@@ -61,12 +154,24 @@ class LalaAssistant:
         self.last_command = None
         self.last_response = None
         
+        # Caché de respuestas: exacta (LRU) y semántica (embeddings recientes)
+        self.response_cache_ttl = 300.0
+        self._exact_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._embed_cache: "Deque[Tuple[Tuple, np.ndarray, float, Dict[str, Any]]]" = deque(maxlen=_SEMANTIC_CACHE_SIZE)
+        self._cache_lock = threading.Lock()
+        
+        # Planner y modelo se consultan en paralelo (ambos esperan E/S)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lala-command")
+        
         # Configurar modo offline según preferencia
+        from services.ai_models_router import ai_router
         ai_router.offline_mode = prefer_offline
         
-        # Thread para escucha en segundo plano
+        # Thread para escucha en segundo plano y consumidor de sus eventos
         self.background_thread = None
-        self.should_stop_background = False
+        self.callback_thread = None
+        self._stop_evt = threading.Event()
+        self._event_q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=_EVENT_QUEUE_SIZE)
         
         logger.info("Asistente Lala inicializado correctamente")
     
@@ -79,12 +184,12 @@ class LalaAssistant:
         """
         logger.info("Iniciando asistente Lala")
         
-        # Iniciar servicios en Android
-        self.android.bridge.vibrate(200)  # Vibración corta
+        # Iniciar servicios en Android (la notificación lleva la vibración corta)
         self.android.notifications.show_notification(
             title="Lala está activa",
             message="Di 'Lala' para activar el asistente",
-            notification_id=1000
+            notification_id=1000,
+            vibrate_ms=200
         )
         
         # Iniciar servicios
@@ -96,6 +201,44 @@ class LalaAssistant:
         
         return True
     
+    def reconfigure(self,
+                  user_id: Optional[int] = None,
+                  prefer_offline: bool = False,
+                  wake_word: str = "Lala") -> bool:
+        """
+        Reconfigura el asistente sin crear una nueva instancia.
+        
+        Java puede conservar su referencia al objeto, y el adaptador Android
+        y el resto de miembros se reutilizan.
+        
+        Args:
+            user_id: ID del usuario actual (opcional)
+            prefer_offline: Si es True, prioriza procesamiento offline
+            wake_word: Palabra de activación para comandos de voz
+            
+        Returns:
+            bool: True si el asistente se reinició correctamente
+        """
+        logger.info("Reconfigurando asistente Lala")
+        
+        if self.is_active:
+            self.stop()
+        
+        if prefer_offline != self.prefer_offline:
+            get_optimal_models_config.cache_clear()
+        
+        self.user_id = user_id
+        self.prefer_offline = prefer_offline
+        self.wake_word = wake_word
+        self._wake_re = re.compile(re.escape(wake_word), re.IGNORECASE)
+        self.last_command = None
+        self.last_response = None
+        
+        from services.ai_models_router import ai_router
+        ai_router.offline_mode = prefer_offline
+        
+        return self.start()
+    
     def stop(self) -> bool:
         """
         Detiene el asistente y sus servicios.
@@ -106,9 +249,7 @@ class LalaAssistant:
         logger.info("Deteniendo asistente Lala")
         
         # Detener escucha en segundo plano si está activa
-        if self.background_thread and self.background_thread.is_alive():
-            self.should_stop_background = True
-            self.background_thread.join(timeout=2.0)
+        self._stop_background_threads()
         
         # Detener servicios en Android
         self.android.voice_recognition.stop_listening()
@@ -139,20 +280,48 @@ class LalaAssistant:
         self.last_command = command_text
         
         # Verificar conexión online
-        online_available = is_online() and not self.prefer_offline
+        online_available = _cached_is_online() and not self.prefer_offline
+        
+        # Buscar una respuesta previa al mismo comando (o a uno muy parecido)
+        scope = (self.user_id, online_available)
+        normalized = command_text.strip().lower()
+        embedding = None
+        cached = self._exact_cache_lookup(scope + (normalized,))
+        if cached is None:
+            # Un fallo del procesador NLP no debe romper el comando: solo se usa la caché exacta
+            try:
+                embedding = self._embed_command(normalized)
+                cached = self._semantic_cache_lookup(scope, embedding)
+            except Exception as e:
+                logger.debug(f"Caché semántica no disponible: {e}")
+                embedding = None
+        
+        if cached is not None:
+            logger.info("Respuesta obtenida de la caché")
+            if wait_for_response:
+                self.android.text_to_speech.speak(cached["response"])
+            self.last_response = cached
+            self.is_processing = False
+            return cached
         
         try:
-            # Procesar con el agente planner
-            planning_result = agent_planner.process_command(command_text, self.user_id)
+            from services.agent_planner import agent_planner
+            from services.ai_models_router import process_ai_request
             
-            # Generar respuesta con el modelo adecuado
-            model_response = process_ai_request(
+            # Procesar con el agente planner y, a la vez, generar respuesta con
+            # el modelo adecuado: la respuesta no depende del plan
+            planning_future = self._executor.submit(
+                agent_planner.process_command, command_text, self.user_id
+            )
+            model_future = self._executor.submit(
+                process_ai_request,
                 prompt=f"Responde al usuario que dice: '{command_text}'",
-                system_prompt="Eres Lala, un asistente de voz amable y servicial. " + 
-                            "Responde de forma concisa y natural.",
+                system_prompt=_LALA_SYSTEM_PROMPT,
                 model_preference="auto" if online_available else "offline",
                 max_tokens=200
             )
+            planning_result = planning_future.result()
+            model_response = model_future.result()
             
             # Integrar respuesta del modelo con el plan
             if planning_result.get("success", False):
@@ -176,6 +345,11 @@ class LalaAssistant:
             # Guardar respuesta
             self.last_response = result
             
+            # Solo se reutilizan respuestas conversacionales: un comando con plan
+            # de acciones debe volver a ejecutarse
+            if not result["plan"]:
+                self._cache_response(scope, normalized, embedding, result)
+        
         except Exception as e:
             logger.error(f"Error al procesar comando: {e}")
             
@@ -191,6 +365,107 @@ class LalaAssistant:
         
         return result
     
+    def _exact_cache_lookup(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        Busca una respuesta guardada para el mismo comando normalizado.
+        
+        Args:
+            key: (user_id, online, comando normalizado)
+            
+        Returns:
+            Optional[Dict]: Copia de la respuesta marcada como cacheada, o None
+        """
+        with self._cache_lock:
+            entry = self._exact_cache.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, result = entry
+            if time.monotonic() - stored_at >= self.response_cache_ttl:
+                del self._exact_cache[key]
+                return None
+            
+            self._exact_cache.move_to_end(key)
+            return {**result, "cached": True}
+    
+    def _semantic_cache_lookup(self, scope: Tuple,
+                             embedding: Optional["np.ndarray"]) -> Optional[Dict[str, Any]]:
+        """
+        Busca una respuesta guardada para un comando semánticamente equivalente.
+        
+        Args:
+            scope: (user_id, online) de la petición actual
+            embedding: Embedding normalizado del comando (None si no disponible)
+            
+        Returns:
+            Optional[Dict]: Copia de la respuesta marcada como cacheada, o None
+        """
+        if embedding is None:
+            return None
+        
+        now = time.monotonic()
+        best_score = _SEMANTIC_THRESHOLD
+        best = None
+        
+        with self._cache_lock:
+            for entry_scope, entry_embedding, stored_at, result in self._embed_cache:
+                if entry_scope != scope or now - stored_at >= self.response_cache_ttl:
+                    continue
+                
+                score = float(entry_embedding @ embedding)
+                if score >= best_score:
+                    best_score = score
+                    best = result
+        
+        return None if best is None else {**best, "cached": True}
+    
+    def _embed_command(self, text: str) -> Optional["np.ndarray"]:
+        """
+        Calcula el embedding normalizado de un comando con el procesador NLP.
+        
+        Args:
+            text: Comando normalizado
+            
+        Returns:
+            Optional[np.ndarray]: Vector unitario, o None si no hay embeddings disponibles
+            (los errores del procesador NLP se propagan a process_text_command)
+        """
+        import numpy as np
+        from services.minilm_nlp import nlp_processor
+        get_embedding = getattr(nlp_processor, "get_embedding", None)
+        if get_embedding is None or not nlp_processor.is_initialized():
+            return None
+        
+        vector = np.asarray(get_embedding(text), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+    
+    def _cache_response(self, scope: Tuple, normalized: str,
+                      embedding: Optional["np.ndarray"], result: Dict[str, Any]) -> None:
+        """
+        Guarda una respuesta en la caché exacta y, si hay embedding, en la semántica.
+        
+        Args:
+            scope: (user_id, online) de la petición
+            normalized: Comando normalizado
+            embedding: Embedding normalizado del comando (opcional)
+            result: Respuesta a guardar
+        """
+        now = time.monotonic()
+        
+        with self._cache_lock:
+            key = scope + (normalized,)
+            # Copia propia: quien recibe el resultado puede modificarlo
+            # (p. ej. process_voice_command añade recognized_text)
+            stored = dict(result)
+            self._exact_cache[key] = (now, stored)
+            self._exact_cache.move_to_end(key)
+            if len(self._exact_cache) > _RESPONSE_CACHE_SIZE:
+                self._exact_cache.popitem(last=False)
+            
+            if embedding is not None:
+                self._embed_cache.append((scope, embedding, now, stored))
+    
     def process_voice_command(self, max_duration_sec: int = 5) -> Dict[str, Any]:
         """
         Graba y procesa un comando de voz.
@@ -204,8 +479,7 @@ class LalaAssistant:
         logger.info("Grabando comando de voz...")
         
         # Iniciar grabación con feedback
-        self.android.bridge.vibrate(100)  # Vibración corta
-        self.android.bridge.show_toast("Escuchando...")
+        self.android.bridge.feedback(vibrate_ms=100, toast="Escuchando...")  # Vibración corta y aviso
         
         # Obtener texto reconocido
         recognized_text = self.android.voice_recognition.recognize_once(max_duration_sec)
@@ -223,11 +497,10 @@ class LalaAssistant:
         command_text = recognized_text
         
         # Buscar palabra de activación
-        wake_word_lower = self.wake_word.lower()
-        if wake_word_lower in recognized_text.lower():
+        match = self._wake_re.search(recognized_text)
+        if match:
             # Extraer texto después de la palabra de activación
-            start_index = recognized_text.lower().find(wake_word_lower) + len(wake_word_lower)
-            command_text = recognized_text[start_index:].strip()
+            command_text = recognized_text[match.end():].strip()
         
         # Procesar el comando de texto
         result = self.process_text_command(command_text)
@@ -251,42 +524,68 @@ class LalaAssistant:
         logger.info("Iniciando escucha continua en segundo plano")
         
         # Si ya hay un hilo en ejecución, detenerlo
-        if self.background_thread and self.background_thread.is_alive():
-            self.should_stop_background = True
-            self.background_thread.join(timeout=2.0)
+        self._stop_background_threads()
         
-        # Reiniciar flag
-        self.should_stop_background = False
+        # Nueva señal de parada y cola de eventos: los hilos anteriores conservan
+        # las suyas, así que uno que no llegó a terminar no se reactiva y nada
+        # pendiente se entrega a este callback
+        self._stop_evt = stop_evt = threading.Event()
+        self._event_q = events = queue.Queue(maxsize=_EVENT_QUEUE_SIZE)
+        deliver = callback is not None and callable(callback)
         
         # Iniciar servicio en Android
         self.android.start_background_assistant()
         
+        # Entregar los comandos al callback fuera del hilo de escucha, para que
+        # un callback lento (p. ej. en Java) no retrase el reconocimiento
+        def callback_consumer_thread():
+            while True:
+                result = events.get()
+                if result is None:
+                    break
+                
+                try:
+                    callback(result)
+                except Exception as e:
+                    logger.error(f"Error en callback de escucha: {e}")
+        
         # Iniciar thread para escucha continua
         def background_listening_thread():
             logger.info("Hilo de escucha continua iniciado")
             
-            while not self.should_stop_background:
+            while not stop_evt.is_set():
                 try:
                     # En implementación real: escuchar continuamente con Vosk
                     # Para este prototipo, simular detección ocasional
                     
-                    # Esperar un tiempo 
-                    time.sleep(2.0)
+                    # Esperar un tiempo (wait() vuelve en cuanto se pide parar)
+                    if stop_evt.wait(2.0):
+                        break
                     
                     # Simular detección de palabra de activación
-                    if not self.is_processing and not self.should_stop_background:
+                    if not self.is_processing and not stop_evt.is_set():
                         # Procesar comando
                         result = self.process_voice_command()
                         
-                        # Llamar a callback si existe
-                        if callback and callable(callback) and result.get("success", False):
-                            callback(result)
+                        # Encolar para el callback si existe (se descarta si la cola está llena)
+                        if deliver and result.get("success", False):
+                            try:
+                                events.put_nowait(result)
+                            except queue.Full:
+                                logger.warning("Cola de eventos llena, comando descartado")
                 
                 except Exception as e:
                     logger.error(f"Error en hilo de escucha: {e}")
-                    time.sleep(1.0)  # Esperar antes de reintentar
+                    stop_evt.wait(1.0)  # Esperar antes de reintentar
+        
+        # Iniciar hilos
+        if deliver:
+            self.callback_thread = threading.Thread(
+                target=callback_consumer_thread,
+                daemon=True
+            )
+            self.callback_thread.start()
         
-        # Iniciar hilo
         self.background_thread = threading.Thread(
             target=background_listening_thread,
             daemon=True
@@ -304,16 +603,38 @@ class LalaAssistant:
         """
         logger.info("Deteniendo escucha continua en segundo plano")
         
-        # Detener hilo
-        if self.background_thread and self.background_thread.is_alive():
-            self.should_stop_background = True
-            self.background_thread.join(timeout=2.0)
+        # Detener hilos
+        self._stop_background_threads()
         
         # Detener servicio en Android
         self.android.stop_background_assistant()
         
         return True
     
+    def _stop_background_threads(self) -> None:
+        """Detiene el hilo de escucha y, tras él, el consumidor de eventos."""
+        self._stop_evt.set()
+        
+        if self.background_thread and self.background_thread.is_alive():
+            self.background_thread.join(timeout=2.0)
+            if self.background_thread.is_alive():
+                logger.warning("El hilo de escucha no terminó a tiempo")
+        
+        # El centinela va detrás de los comandos ya encolados
+        if self.callback_thread and self.callback_thread.is_alive():
+            try:
+                self._event_q.put(None, timeout=2.0)
+            except queue.Full:
+                logger.warning("No se pudo despertar al consumidor de eventos")
+            self.callback_thread.join(timeout=2.0)
+            if self.callback_thread.is_alive():
+                logger.warning("El hilo de callbacks no terminó a tiempo")
+        
+        # Soltar las referencias: un hilo bloqueado ya no retiene el callback
+        # a través del asistente
+        self.background_thread = None
+        self.callback_thread = None
+    
     def set_wake_word(self, wake_word: str) -> bool:
         """
         Cambia la palabra de activación.
@@ -330,6 +651,7 @@ class LalaAssistant:
         
         logger.info(f"Cambiando palabra de activación a: '{wake_word}'")
         self.wake_word = wake_word
+        self._wake_re = re.compile(re.escape(wake_word), re.IGNORECASE)
         
         # Notificar al usuario
         self.android.bridge.show_toast(f"Palabra de activación cambiada a: {wake_word}")
@@ -349,8 +671,13 @@ class LalaAssistant:
         logger.info(f"Cambiando preferencia offline a: {prefer_offline}")
         
         self.prefer_offline = prefer_offline
+        
+        from services.ai_models_router import ai_router
         ai_router.offline_mode = prefer_offline
         
+        # La selección de modelos puede cambiar con el modo offline
+        get_optimal_models_config.cache_clear()
+        
         # Notificar al usuario
         mode_name = "offline" if prefer_offline else "online cuando sea posible"
         self.android.bridge.show_toast(f"Modo cambiado a: {mode_name}")
@@ -365,11 +692,17 @@ class LalaAssistant:
             Dict: Configuración actual
         """
         # Obtener estado del dispositivo
-        device_status = self.android.get_device_status()
+        device_status = self.android.get_device_status()._asdict()
         
         # Obtener configuración de modelos
         model_config = get_optimal_models_config()
         
+        # Servicios de IA disponibles (un solo recorrido de la lista)
+        from services.ai_models_router import ai_router
+        services = frozenset(ai_router.available_services)
+        
+        # Diccionarios pequeños construidos en cada llamada: no comparten estado
+        # entre llamadas ni hilos (la lista de modelos es la de la caché)
         return {
             "wake_word": self.wake_word,
             "prefer_offline": self.prefer_offline,
@@ -381,18 +714,112 @@ class LalaAssistant:
                 "max_size_mb": model_config["max_size_mb"],
                 "models": model_config["models"]
             },
-            "online_available": is_online(),
-            "api_services": {
-                "openai": ai_router.available_services.count("openai") > 0,
-                "anthropic": ai_router.available_services.count("anthropic") > 0,
-                "gemini": ai_router.available_services.count("gemini") > 0,
-                "grok": ai_router.available_services.count("grok") > 0
-            }
+            "online_available": _cached_is_online(),
+            "api_services": {service: service in services for service in _API_SERVICES}
         }
 
 
-# Crear una instancia global del asistente para uso fácil
-assistant = LalaAssistant()
+# Respuestas predefinidas para el modo demostración.
+# sys.argv no cambia durante la ejecución: se evalúa una sola vez
+_DEMO_MODE = "--demo" in sys.argv or "--offline" in sys.argv
+
+# Reglas en orden de prioridad: (palabras clave, respuesta, plan)
+_DEMO_RULES = (
+    (("hola",),
+     "¡Hola! Soy Lala, tu asistente virtual. ¿En qué puedo ayudarte hoy?",
+     None),
+    (("qué puedes hacer", "funciones"),
+     "Puedo ayudarte con muchas cosas: responder preguntas, configurar alarmas, enviar mensajes, controlar aplicaciones, obtener información del clima y noticias, y mucho más. Estoy diseñada para funcionar incluso sin internet.",
+     None),
+    (("clima",),
+     "En Madrid el clima está parcialmente nublado con una temperatura de 22°C. La humedad es del 65% y hay viento de 10 km/h.",
+     {"action": "get_weather", "location": "Madrid"}),
+    (("alarma",),
+     "He configurado una alarma para las 8:00 de la mañana.",
+     {"action": "set_alarm", "time": "8:00 AM"}),
+    (("mensaje",),
+     "He enviado tu mensaje a Juan por WhatsApp.",
+     {"action": "send_message", "app": "whatsapp", "contact": "Juan", "message": "Llegaré tarde"}),
+)
+_DEMO_OPEN_KEYWORDS = ("abre", "abrir")
+_DEMO_APPS = ("mapas", "youtube", "cámara")
+
+# Palabra clave -> posición (prioridad) de su regla en _DEMO_RULES
+_DEMO_RULE_INDEX = {k: i for i, (keywords, _, _) in enumerate(_DEMO_RULES) for k in keywords}
+
+# Una única búsqueda encuentra todas las palabras clave presentes en el comando
+_DEMO_RE = re.compile(
+    "|".join(re.escape(k) for keywords, _, _ in _DEMO_RULES for k in keywords) +
+    "|" + "|".join(_DEMO_OPEN_KEYWORDS),
+    re.IGNORECASE
+)
+
+
+def _demo_response(response: str, plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Construye una respuesta simulada del modo demostración."""
+    result = {
+        "success": True,
+        "response": response,
+        "model": "offline-demo",
+        "online": False
+    }
+    if plan is not None:
+        result["plan"] = dict(plan)
+    return result
+
+
+def _demo_lookup(command_text: str) -> Dict[str, Any]:
+    """
+    Obtiene la respuesta predefinida de un comando en modo demostración.
+    
+    Args:
+        command_text: Texto del comando
+        
+    Returns:
+        Dict: Respuesta simulada
+    """
+    matched = {m.group(0).lower() for m in _DEMO_RE.finditer(command_text)}
+    
+    rule_indexes = [_DEMO_RULE_INDEX[k] for k in matched if k in _DEMO_RULE_INDEX]
+    if rule_indexes:
+        _, response, plan = _DEMO_RULES[min(rule_indexes)]
+        return _demo_response(response, plan)
+    
+    if not matched.isdisjoint(_DEMO_OPEN_KEYWORDS):
+        command_lower = command_text.lower()
+        app_name = next((app for app in _DEMO_APPS if app in command_lower), "mapas")
+        return _demo_response(
+            f"Abriendo la aplicación de {app_name}.",
+            {"action": "open_app", "app_name": app_name}
+        )
+    
+    # Respuesta genérica para otros comandos
+    return _demo_response(
+        f"Entiendo tu solicitud: '{command_text}'. En un dispositivo real, podría ejecutar esta acción correctamente."
+    )
+
+
+# Instancia global del asistente: se crea en el primer uso de la API (o en
+# initialize_assistant), no al importar el módulo
+assistant: Optional[LalaAssistant] = None
+_ASSISTANT_LOCK = threading.Lock()
+
+
+def _get_assistant() -> LalaAssistant:
+    """
+    Devuelve la instancia global del asistente, creándola si no existe.
+    
+    Returns:
+        LalaAssistant: Asistente compartido por las funciones de la API
+    """
+    global assistant
+    
+    if assistant is None:
+        with _ASSISTANT_LOCK:
+            if assistant is None:
+                assistant = LalaAssistant()
+    
+    return assistant
 
 
 # API principales para usar desde Java/Kotlin
@@ -413,11 +840,14 @@ def initialize_assistant(user_id: Optional[int] = None,
     global assistant
     
     try:
-        # Crear nueva instancia con parámetros específicos
-        assistant = LalaAssistant(user_id, prefer_offline, wake_word)
-        
-        # Iniciar asistente
-        success = assistant.start()
+        with _ASSISTANT_LOCK:
+            if assistant is None:
+                # Primera inicialización: crear el asistente ya configurado
+                assistant = LalaAssistant(user_id, prefer_offline, wake_word)
+                success = assistant.start()
+            else:
+                # Reconfigurar la instancia existente e iniciarla
+                success = assistant.reconfigure(user_id, prefer_offline, wake_word)
         
         return {
             "success": success,
@@ -443,91 +873,17 @@ def process_command(command_text: str) -> Dict[str, Any]:
     Returns:
         Dict: Respuesta del procesamiento
     """
-    global assistant
+    # Verificar si es una demostración y simular respuestas
+    if _DEMO_MODE:
+        return _demo_lookup(command_text)
     
     try:
-        # Verificar si es una demostración y simular respuestas
-        if "--demo" in sys.argv or "--offline" in sys.argv:
-            # Simulación de respuestas predefinidas para demo
-            if "hola" in command_text.lower():
-                return {
-                    "success": True,
-                    "response": "¡Hola! Soy Lala, tu asistente virtual. ¿En qué puedo ayudarte hoy?",
-                    "model": "offline-demo",
-                    "online": False
-                }
-            elif "qué puedes hacer" in command_text.lower() or "funciones" in command_text.lower():
-                return {
-                    "success": True,
-                    "response": "Puedo ayudarte con muchas cosas: responder preguntas, configurar alarmas, enviar mensajes, controlar aplicaciones, obtener información del clima y noticias, y mucho más. Estoy diseñada para funcionar incluso sin internet.",
-                    "model": "offline-demo",
-                    "online": False
-                }
-            elif "clima" in command_text.lower():
-                return {
-                    "success": True,
-                    "response": "En Madrid el clima está parcialmente nublado con una temperatura de 22°C. La humedad es del 65% y hay viento de 10 km/h.",
-                    "model": "offline-demo",
-                    "online": False,
-                    "plan": {"action": "get_weather", "location": "Madrid"}
-                }
-            elif "alarma" in command_text.lower():
-                return {
-                    "success": True,
-                    "response": "He configurado una alarma para las 8:00 de la mañana.",
-                    "model": "offline-demo",
-                    "online": False,
-                    "plan": {"action": "set_alarm", "time": "8:00 AM"}
-                }
-            elif "mensaje" in command_text.lower():
-                return {
-                    "success": True,
-                    "response": "He enviado tu mensaje a Juan por WhatsApp.",
-                    "model": "offline-demo",
-                    "online": False,
-                    "plan": {"action": "send_message", "app": "whatsapp", "contact": "Juan", "message": "Llegaré tarde"}
-                }
-            elif "abre" in command_text.lower() or "abrir" in command_text.lower():
-                app_name = "mapas"
-                if "mapas" in command_text.lower():
-                    app_name = "mapas"
-                elif "youtube" in command_text.lower():
-                    app_name = "youtube"
-                elif "cámara" in command_text.lower():
-                    app_name = "cámara"
-                
-                return {
-                    "success": True,
-                    "response": f"Abriendo la aplicación de {app_name}.",
-                    "model": "offline-demo",
-                    "online": False,
-                    "plan": {"action": "open_app", "app_name": app_name}
-                }
-            else:
-                # Respuesta genérica para otros comandos
-                return {
-                    "success": True,
-                    "response": f"Entiendo tu solicitud: '{command_text}'. En un dispositivo real, podría ejecutar esta acción correctamente.",
-                    "model": "offline-demo",
-                    "online": False
-                }
-                
         # Procesar comando normalmente
-        return assistant.process_text_command(command_text)
+        return _get_assistant().process_text_command(command_text)
     
     except Exception as e:
         logger.error(f"Error al procesar comando: {e}")
         
-        # En caso de error en modo demo, proporcionar respuesta simulada
-        if "--demo" in sys.argv:
-            return {
-                "success": True,
-                "response": f"Entiendo tu solicitud: '{command_text}'. En un dispositivo real, podría ejecutar esta acción correctamente.",
-                "model": "offline-demo",
-                "online": False,
-                "simulated": True
-            }
-        
         return {
             "success": False,
             "error": str(e)
@@ -541,10 +897,8 @@ def listen_for_command() -> Dict[str, Any]:
     Returns:
         Dict: Respuesta del procesamiento
     """
-    global assistant
-    
     try:
-        return assistant.process_voice_command()
+        return _get_assistant().process_voice_command()
     
     except Exception as e:
         logger.error(f"Error al procesar comando de voz: {e}")
@@ -562,10 +916,8 @@ def start_continuous_listening() -> Dict[str, Any]:
     Returns:
         Dict: Resultado de la operación
     """
-    global assistant
-    
     try:
-        success = assistant.start_background_listening()
+        success = _get_assistant().start_background_listening()
         
         return {
             "success": success
@@ -587,10 +939,8 @@ def stop_continuous_listening() -> Dict[str, Any]:
     Returns:
         Dict: Resultado de la operación
     """
-    global assistant
-    
     try:
-        success = assistant.stop_background_listening()
+        success = _get_assistant().stop_background_listening()
         
         return {
             "success": success
@@ -615,9 +965,9 @@ def update_configuration(config: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict: Configuración actualizada
     """
-    global assistant
-    
     try:
+        assistant = _get_assistant()
+    
         # Actualizar configuraciones
         if "wake_word" in config:
             assistant.set_wake_word(config["wake_word"])
@@ -646,17 +996,17 @@ def get_assistant_status() -> Dict[str, Any]:
     Returns:
         Dict: Estado actual
     """
-    global assistant
-    
     try:
+        assistant = _get_assistant()
+    
         return {
             "success": True,
             "status": {
                 "is_active": assistant.is_active,
                 "is_processing": assistant.is_processing,
                 "last_command": assistant.last_command,
-                "online_available": is_online(),
-                "device": assistant.android.get_device_status()
+                "online_available": _cached_is_online(),
+                "device": assistant.android.get_device_status()._asdict()
             }
         }
     
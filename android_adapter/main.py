@@ -8,8 +8,9 @@ en un entorno Android, configurando componentes y servicios necesarios.
 import os
 import sys
 import logging
-import json
 import argparse
+import importlib.util
+import concurrent.futures
 from typing import Dict, Any, Optional
 
 # Configurar logging
@@ -19,31 +20,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger("lala_android")
 
-# Importar componentes de Lala
+# Importar componentes de Lala (los que cargan modelos se importan al usarse)
 from .core import get_android_adapter
-from .integration import initialize_assistant, assistant
-from .vosk_integration import recognizer as vosk_recognizer
-from .tts_integration import tts_engine
-from services.model_optimizer import get_optimal_models_config
-from services.minilm_nlp import nlp_processor, process_text
-from services.agent_planner import agent_planner
-from services.ai_models_router import ai_router
+from .integration import initialize_assistant, get_optimal_models_config
+
+
+# Directorios de recursos de la aplicación (el padre siempre va antes que sus hijos)
+_BASE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), ".."))
+_ASSET_DIRS = tuple(
+    os.path.join(_BASE_DIR, "assets", sub) if sub else os.path.join(_BASE_DIR, "assets")
+    for sub in ("", "models", "audio", "data", "temp")
+)
 
 
 def ensure_directories() -> None:
     """Crea directorios necesarios para la aplicación."""
-    directories = [
-        os.path.join(os.path.dirname(__file__), "..", "assets"),
-        os.path.join(os.path.dirname(__file__), "..", "assets", "models"),
-        os.path.join(os.path.dirname(__file__), "..", "assets", "audio"),
-        os.path.join(os.path.dirname(__file__), "..", "assets", "data"),
-        os.path.join(os.path.dirname(__file__), "..", "assets", "temp")
-    ]
-    
-    for directory in directories:
-        if not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-            logger.info(f"Creado directorio: {directory}")
+    for directory in _ASSET_DIRS:
+        # Una sola llamada al sistema por directorio (sin stat previo)
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            continue
+        
+        logger.info(f"Creado directorio: {directory}")
 
 
 def check_requirements() -> Dict[str, bool]:
@@ -53,6 +52,12 @@ def check_requirements() -> Dict[str, bool]:
     Returns:
         Dict[str, bool]: Estado de los requisitos
     """
+    from .vosk_integration import recognizer as vosk_recognizer
+    from .tts_integration import tts_engine
+    from services.minilm_nlp import nlp_processor
+    from services.agent_planner import agent_planner
+    from services.ai_models_router import ai_router
+    
     requirements = {
         "vosk_available": hasattr(vosk_recognizer, "is_initialized") and vosk_recognizer.is_initialized(),
         "tts_available": hasattr(tts_engine, "is_initialized") and tts_engine.is_initialized(),
@@ -74,6 +79,52 @@ def check_requirements() -> Dict[str, bool]:
     return requirements
 
 
+def _ensure_initialized(component: Any) -> bool:
+    """
+    Inicializa un componente si todavía no lo está.
+    
+    Args:
+        component: Componente con métodos is_initialized() e initialize()
+        
+    Returns:
+        bool: True si el componente queda inicializado
+    """
+    return component.is_initialized() or component.initialize()
+
+
+def _warmup_jit() -> bool:
+    """
+    Compila por adelantado las funciones Numba del VAD y del remuestreo de Vosk.
+    
+    La compilación (o su carga desde la caché en disco) se hace durante la
+    inicialización y no recae en el primer audio del usuario.
+    
+    Returns:
+        bool: True si Numba está disponible y el calentamiento se completó
+    """
+    if importlib.util.find_spec("numba") is None:
+        # Sin Numba (p. ej. python-for-android) se usa la ruta con NumPy
+        logger.debug("Numba no disponible, se omite el calentamiento JIT")
+        return False
+    
+    try:
+        import numpy as np
+        from .vosk_integration import _numba_kernels, _polyphase_bank
+        
+        kernels = _numba_kernels()
+        if kernels is None:
+            return False
+        
+        rms, preprocess = kernels
+        samples = np.zeros(16, dtype=np.int16)
+        rms(samples)
+        preprocess(samples, 0, 8, 1, 2, *_polyphase_bank(1, 2), 0.0)
+        return True
+    except Exception as e:
+        logger.warning(f"Error en calentamiento JIT: {e}")
+        return False
+
+
 def initialize_components(model_size_mb: int = 350, prefer_offline: bool = False) -> Dict[str, Any]:
     """
     Inicializa componentes principales de Lala.
@@ -88,6 +139,11 @@ def initialize_components(model_size_mb: int = 350, prefer_offline: bool = False
     results = {}
     
     try:
+        from .vosk_integration import recognizer as vosk_recognizer
+        from .tts_integration import tts_engine
+        from services.minilm_nlp import nlp_processor
+        from services.ai_models_router import ai_router
+        
         # Asegurar directorios
         ensure_directories()
         
@@ -95,26 +151,19 @@ def initialize_components(model_size_mb: int = 350, prefer_offline: bool = False
         model_config = get_optimal_models_config(model_size_mb)
         results["model_config"] = model_config
         
-        # Inicializar procesador NLP
-        if not nlp_processor.is_initialized():
-            nlp_initialized = nlp_processor.initialize()
-            results["nlp_initialized"] = nlp_initialized
-        else:
-            results["nlp_initialized"] = True
-        
-        # Inicializar reconocedor de voz Vosk
-        if not vosk_recognizer.is_initialized():
-            vosk_initialized = vosk_recognizer.initialize()
-            results["vosk_initialized"] = vosk_initialized
-        else:
-            results["vosk_initialized"] = True
-        
-        # Inicializar motor TTS
-        if not tts_engine.is_initialized():
-            tts_initialized = tts_engine.initialize()
-            results["tts_initialized"] = tts_initialized
-        else:
-            results["tts_initialized"] = True
+        # Inicializar procesador NLP, reconocedor Vosk y motor TTS en paralelo:
+        # son independientes y su carga de modelos es principalmente E/S. La
+        # compilación JIT se solapa con ellos
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                "nlp_initialized": executor.submit(_ensure_initialized, nlp_processor),
+                "vosk_initialized": executor.submit(_ensure_initialized, vosk_recognizer),
+                "tts_initialized": executor.submit(_ensure_initialized, tts_engine),
+                "jit_warmed_up": executor.submit(_warmup_jit)
+            }
+        
+        for key, future in futures.items():
+            results[key] = future.result()
         
         # Configurar preferencia offline
         ai_router.offline_mode = prefer_offline
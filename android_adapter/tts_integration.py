@@ -5,14 +5,24 @@ Este módulo proporciona la integración con sistemas de síntesis de voz offlin
 usando interfaces simuladas de Coqui TTS para Android.
 """
 
+import io
 import os
+import re
 import logging
 import time
 import json
-from typing import Dict, Any, Optional, List, Union, BinaryIO
+import wave
+import hashlib
+import pathlib
+import threading
+import types
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Mapping, Set, Tuple, Union, BinaryIO
 
-# Configuración de logging
-logging.basicConfig(level=logging.DEBUG)
+from .core import LazyProxy
+
+# Logging del módulo (la aplicación que lo usa configura los handlers y el nivel)
 logger = logging.getLogger(__name__)
 
 # Intentar importar TTS (este es un prototipo, no requiere instalación real)
@@ -26,6 +36,49 @@ except ImportError:
 
 # Constantes
 DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "models", "tts-vits-es")
+QUANTIZED_SUFFIX = "-int8"  # Variante int8 de un modelo: mismo directorio con este sufijo
+SAMPLE_RATE = 22050  # Frecuencia de muestreo del audio sintetizado (VITS)
+DEFAULT_CACHE_CAPACITY = 128  # Audios sintetizados que se conservan en memoria
+_NON_WORD_RE = re.compile(r"[^\w\s]+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?;:])\s+")
+
+# Frases frecuentes del asistente que se sintetizan al inicializar
+PREWARM_PHRASES = (
+    "Sí",
+    "No",
+    "Un momento",
+    "Hecho",
+    "No te he entendido",
+    "¿En qué puedo ayudarte?",
+    "Lo siento, ocurrió un error al procesar tu solicitud."
+)
+_PREWARM_SET = frozenset(PREWARM_PHRASES)
+_PREWARM_WAIT = 0.5  # Espera máxima (s) de speak() por una frase que se está precalentando
+
+# Voces simuladas para prototipo (vistas de solo lectura compartidas entre llamadas)
+_VOICES: Tuple[Mapping[str, str], ...] = tuple(types.MappingProxyType(voice) for voice in (
+    {
+        "id": "es_female_1",
+        "name": "Carmen",
+        "language": "es",
+        "gender": "female",
+        "quality": "high"
+    },
+    {
+        "id": "es_male_1",
+        "name": "Pablo",
+        "language": "es",
+        "gender": "male",
+        "quality": "high"
+    },
+    {
+        "id": "es_female_2",
+        "name": "Ana",
+        "language": "es",
+        "gender": "female",
+        "quality": "medium"
+    }
+))
 
 
 class TtsEngine:
@@ -36,19 +89,47 @@ class TtsEngine:
     usando Coqui TTS o alternativas según disponibilidad.
     """
     
-    def __init__(self, model_path: str = DEFAULT_MODEL_PATH):
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH,
+               cache_capacity: int = DEFAULT_CACHE_CAPACITY,
+               quantized: bool = True):
         """
         Inicializa el motor TTS.
         
         Args:
             model_path: Ruta al modelo Coqui TTS
+            cache_capacity: Número máximo de audios sintetizados en caché (0 la desactiva)
+            quantized: Si es True, usa la variante int8 del modelo cuando está instalada
         """
+        # El modelo int8 (p. ej. exportado con quantize_dynamic) ocupa menos memoria
+        quantized_path = model_path.rstrip("/\\") + QUANTIZED_SUFFIX
+        if quantized and os.path.isdir(quantized_path):
+            model_path = quantized_path
+        
         self.model_path = model_path
         self.model = None
         self._is_initialized = False
-        self._is_speaking = False
         self._current_text = None
         
+        # Caché LRU de audio sintetizado: las frases repetidas no pasan por el modelo
+        self.cache_capacity = max(cache_capacity, 0)
+        self._cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # Precalentamiento: frases ya sintetizadas y aviso a speak() cuando hay una nueva
+        self._prewarming = False
+        self._prewarmed: Set[str] = set()
+        self._prewarm_cond = threading.Condition()
+        
+        # Síntesis fuera del hilo que llama; un solo hilo conserva el orden de las frases
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lala-tts")
+        
+        # Reproducción: un hilo que consume en orden los textos de speak();
+        # el motor está hablando mientras quede alguno pendiente
+        self._playback = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lala-tts-playback")
+        self._speak_lock = threading.Lock()
+        self._queued_utterances = 0
+        self._generation = 0
+        
         # Intentar inicializar si está disponible
         if COQUI_AVAILABLE and os.path.exists(model_path):
             self.initialize()
@@ -63,14 +144,39 @@ class TtsEngine:
         # En una implementación real, aquí se cargaría el modelo Coqui TTS
         
         # Para este prototipo, simular inicialización
-        logger.info(f"Simulando inicialización de TTS con modelo: {self.model_path}")
+        logger.info("Simulando inicialización de TTS con modelo: %s", self.model_path)
         
         # Simular éxito de inicialización
         self._is_initialized = True
         logger.info("Motor TTS inicializado correctamente (simulado)")
         
+        # Sintetizar las frases frecuentes en segundo plano
+        with self._prewarm_cond:
+            start_prewarm = not self._prewarming
+            self._prewarming = True
+        if start_prewarm:
+            threading.Thread(target=self._prewarm, daemon=True).start()
+        
         return True
     
+    def _prewarm(self) -> None:
+        """Llena la caché de audio con PREWARM_PHRASES."""
+        for phrase in PREWARM_PHRASES:
+            try:
+                self._render(phrase)
+            except Exception as e:
+                logger.warning("Error al precalentar frase '%s': %s", phrase, e)
+            
+            with self._prewarm_cond:
+                self._prewarmed.add(phrase)
+                self._prewarm_cond.notify_all()
+        
+        with self._prewarm_cond:
+            self._prewarming = False
+            self._prewarm_cond.notify_all()
+        
+        logger.debug("Caché TTS precalentada con %s frases", len(PREWARM_PHRASES))
+    
     def is_initialized(self) -> bool:
         """
         Verifica si el motor está inicializado.
@@ -87,7 +193,8 @@ class TtsEngine:
         Returns:
             bool: Estado de reproducción
         """
-        return self._is_speaking
+        with self._speak_lock:
+            return self._queued_utterances > 0
     
     def synthesize(self, text: str, output_path: Optional[str] = None,
                 language: str = "es", speaker: Optional[str] = None) -> Dict[str, Any]:
@@ -106,54 +213,64 @@ class TtsEngine:
         if not self._is_initialized:
             return {"success": False, "error": "Motor TTS no inicializado"}
         
-        logger.info(f"Sintetizando texto: '{text}'")
+        logger.info("Sintetizando texto: '%s'", text)
         
         try:
-            # Actualizar estado
-            self._is_speaking = True
+            # Actualizar estado (synthesize() no reproduce: no cambia is_speaking())
             self._current_text = text
             
-            # En una implementación real, aquí se llamaría a Coqui TTS
-            # wav = self.model.tts(text=text, speaker=speaker, language=language)
-            
-            # Simular procesamiento
-            time.sleep(len(text) * 0.02)  # ~20ms por carácter
+            # Sintetizar (o reutilizar el audio de la caché); el WAV queda en memoria
+            wav = self._render(text, language, speaker)
             
-            # Simular guardado si se solicita
+            # Escribir a disco solo si se pide un archivo
             if output_path:
-                # En una app real: self.model.save_wav(wav, output_path)
-                logger.info(f"Simulando guardado de audio en: {output_path}")
+                self._save_wav(wav, output_path)
+                logger.info("Audio guardado en: %s", output_path)
                 
-                # Crear archivo de texto simulado (para depuración)
-                try:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    with open(output_path + ".txt", "w") as f:
-                        f.write(f"Texto sintetizado: {text}\nIdioma: {language}\nHablante: {speaker}")
-                except Exception as e:
-                    logger.warning(f"No se pudo crear archivo de depuración: {e}")
-            
-            # Actualizar estado
-            self._is_speaking = False
+                # Crear archivo de texto (solo para depuración)
+                if logger.isEnabledFor(logging.DEBUG):
+                    try:
+                        with open(output_path + ".txt", "w") as f:
+                            f.write(f"Texto sintetizado: {text}\nIdioma: {language}\nHablante: {speaker}")
+                    except Exception as e:
+                        logger.warning("No se pudo crear archivo de depuración: %s", e)
             
             return {
                 "success": True,
                 "text": text,
                 "language": language,
                 "speaker": speaker,
-                "output_path": output_path
+                "output_path": output_path,
+                "audio": wav
             }
             
         except Exception as e:
-            # Actualizar estado en caso de error
-            self._is_speaking = False
-            
-            logger.error(f"Error al sintetizar texto: {e}")
+            logger.error("Error al sintetizar texto: %s", e)
             return {"success": False, "error": str(e)}
     
+    def synthesize_async(self, text: str, output_path: Optional[str] = None,
+                      language: str = "es", speaker: Optional[str] = None) -> "Future[Dict[str, Any]]":
+        """
+        Sintetiza texto a voz en segundo plano.
+        
+        Args:
+            text: Texto a sintetizar
+            output_path: Ruta donde guardar el audio (opcional)
+            language: Código de idioma
+            speaker: ID de voz específica (opcional)
+            
+        Returns:
+            Future[Dict]: Resultado diferido de synthesize()
+        """
+        return self._executor.submit(self.synthesize, text, output_path, language, speaker)
+    
     def speak(self, text: str, language: str = "es", speaker: Optional[str] = None,
             rate: float = 1.0, pitch: float = 1.0) -> Dict[str, Any]:
         """
-        Reproduce texto a voz directamente.
+        Reproduce texto a voz en streaming, sin esperar a que termine.
+        
+        El texto se sintetiza frase a frase y la reproducción empieza en cuanto
+        está lista la primera, mientras se sintetizan las demás.
         
         Args:
             text: Texto a sintetizar y reproducir
@@ -163,28 +280,27 @@ class TtsEngine:
             pitch: Tono de voz (0.5-2.0)
             
         Returns:
-            Dict: Resultado de la síntesis y reproducción
+            Dict: Reproducción encolada; "future" se resuelve con el resultado final
         """
         if not self._is_initialized:
             return {"success": False, "error": "Motor TTS no inicializado"}
         
-        logger.info(f"Reproduciendo texto: '{text}' (rate={rate}, pitch={pitch})")
+        logger.info("Reproduciendo texto: '%s' (rate=%s, pitch=%s)", text, rate, pitch)
         
         try:
             # Actualizar estado
-            self._is_speaking = True
+            with self._speak_lock:
+                self._queued_utterances += 1
             self._current_text = text
             
-            # En Android, aquí se usaría el sistema de reproducción nativo
-            # o se sintetizaría primero y luego se reproduciría el audio
-            
-            # Simular procesamiento y reproducción
-            time.sleep(len(text) * 0.05)  # ~50ms por carácter para reproducción
+            # Sintetizar frase a frase (o reutilizar el audio de la caché)
+            sentences = [sentence for sentence in _SENTENCE_RE.split(text.strip()) if sentence]
+            renders = [
+                self._executor.submit(self._render_for_playback, sentence, language, speaker, rate, pitch)
+                for sentence in sentences
+            ]
             
-            # Actualizar estado
-            self._is_speaking = False
-            
-            return {
+            result = {
                 "success": True,
                 "text": text,
                 "language": language,
@@ -193,12 +309,199 @@ class TtsEngine:
                 "pitch": pitch
             }
             
+            # El hilo de reproducción reproduce cada frase en cuanto está sintetizada
+            future = self._playback.submit(self._play, self._generation, sentences, renders, result)
+            
+            return {**result, "streaming": True, "future": future}
+        
         except Exception as e:
             # Actualizar estado en caso de error
-            self._is_speaking = False
+            with self._speak_lock:
+                self._queued_utterances -= 1
+            
+            logger.error("Error al reproducir texto: %s", e)
+            return {"success": False, "error": str(e)}
+    
+    def _render_for_playback(self, text: str, language: str, speaker: Optional[str],
+                          rate: float, pitch: float) -> bytes:
+        """
+        Sintetiza una frase para speak(), esperando si se está precalentando.
+        
+        Args:
+            text: Frase a sintetizar
+            language: Código de idioma
+            speaker: ID de voz específica (opcional)
+            rate: Velocidad de la voz
+            pitch: Tono de voz
+            
+        Returns:
+            bytes: Audio sintetizado
+        """
+        # Si la frase se está precalentando, esperar brevemente a su audio
+        if text in _PREWARM_SET:
+            with self._prewarm_cond:
+                self._prewarm_cond.wait_for(
+                    lambda: text in self._prewarmed or not self._prewarming,
+                    timeout=_PREWARM_WAIT
+                )
+            
+        return self._render(text, language, speaker, rate, pitch)
+            
+    def _play(self, generation: int, sentences: List[str],
+            renders: List["Future[bytes]"], result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reproduce en orden las frases de un texto según se van sintetizando.
+        
+        Args:
+            generation: Valor de _generation al encolar (stop() lo incrementa)
+            sentences: Frases del texto
+            renders: Síntesis pendientes de cada frase
+            result: Resultado a devolver si la reproducción termina bien
+            
+        Returns:
+            Dict: Resultado de la síntesis y reproducción
+        """
+        try:
+            for sentence, render in zip(sentences, renders):
+                # stop() interrumpe la reproducción: descartar las frases pendientes
+                if generation != self._generation:
+                    for pending in renders:
+                        pending.cancel()
+                    return {**result, "interrupted": True}
+                
+                wav = render.result()
+            
+                # En Android, aquí se pasaría wav directamente a AudioTrack (sin archivo intermedio)
+            
+                # Simular reproducción
+                time.sleep(len(sentence) * 0.03)  # ~30ms por carácter para reproducción
             
-            logger.error(f"Error al reproducir texto: {e}")
+            return result
+            
+        except Exception as e:
+            logger.error("Error al reproducir texto: %s", e)
             return {"success": False, "error": str(e)}
+        
+        finally:
+            # Actualizar estado
+            with self._speak_lock:
+                self._queued_utterances -= 1
+    
+    def _render(self, text: str, language: str = "es", speaker: Optional[str] = None,
+              rate: float = 1.0, pitch: float = 1.0) -> bytes:
+        """
+        Sintetiza texto a audio, reutilizando el resultado si ya está en caché.
+        
+        Args:
+            text: Texto a sintetizar
+            language: Código de idioma
+            speaker: ID de voz específica (opcional)
+            rate: Velocidad de la voz
+            pitch: Tono de voz
+            
+        Returns:
+            bytes: Audio sintetizado
+        """
+        # Caché desactivada: sintetizar siempre
+        if not self.cache_capacity:
+            return self._synthesize_wav(text, language, speaker)
+        
+        # La clave usa el texto normalizado: "Hola" y "¡hola!" comparten audio,
+        # pero cualquier diferencia en las palabras o cifras produce otro audio
+        key = hashlib.blake2b(
+            repr((self._normalize(text), language, speaker, rate, pitch)).encode("utf-8"), digest_size=16
+        ).digest()
+        
+        with self._cache_lock:
+            wav = self._cache.get(key)
+            if wav is not None:
+                self._cache.move_to_end(key)
+                logger.debug("Audio obtenido de la caché: '%s'", text)
+                return wav
+        
+        wav = self._synthesize_wav(text, language, speaker)
+        
+        with self._cache_lock:
+            self._cache[key] = wav
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_capacity:
+                self._cache.popitem(last=False)
+        
+        return wav
+    
+    def _synthesize_wav(self, text: str, language: str = "es", speaker: Optional[str] = None) -> bytes:
+        """
+        Sintetiza texto a audio con el modelo, sin consultar la caché.
+        
+        Args:
+            text: Texto a sintetizar
+            language: Código de idioma
+            speaker: ID de voz específica (opcional)
+            
+        Returns:
+            bytes: Audio sintetizado (WAV)
+        """
+        # En una implementación real, aquí se llamaría a Coqui TTS
+        # wav = self.model.tts(text=text, speaker=speaker, language=language)
+        
+        # Simular procesamiento
+        time.sleep(len(text) * 0.02)  # ~20ms por carácter
+        return self._encode_wav(bytes(2 * int(len(text) * 0.03 * SAMPLE_RATE)))  # Silencio int16
+    
+    @staticmethod
+    def _encode_wav(pcm: bytes) -> bytes:
+        """
+        Empaqueta muestras PCM de 16 bits en un WAV mono, en memoria.
+        
+        Args:
+            pcm: Muestras int16 (little-endian)
+            
+        Returns:
+            bytes: Contenido del archivo WAV
+        """
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(pcm)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _save_wav(wav: bytes, output_path: str) -> None:
+        """
+        Escribe un WAV ya sintetizado con una sola escritura.
+        
+        Args:
+            wav: Contenido del archivo WAV
+            output_path: Ruta del archivo de salida
+        """
+        path = pathlib.Path(output_path)
+        try:
+            path.write_bytes(wav)
+        except FileNotFoundError:
+            # Solo se crea el directorio la primera vez que falta
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(wav)
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Normaliza un texto para la clave de la caché de audio.
+        
+        Args:
+            text: Texto a sintetizar
+            
+        Returns:
+            str: Texto sin mayúsculas, signos de puntuación ni espacios repetidos
+            (el original si no queda ningún carácter útil)
+        """
+        return " ".join(_NON_WORD_RE.sub(" ", text.casefold()).split()) or text
+    
+    def clear_cache(self) -> None:
+        """Vacía la caché de audio sintetizado."""
+        with self._cache_lock:
+            self._cache.clear()
     
     def stop(self) -> bool:
         """
@@ -207,16 +510,17 @@ class TtsEngine:
         Returns:
             bool: True si se detuvo correctamente
         """
-        if not self._is_speaking:
-            return True
+        # Los textos encolados antes de este punto dejan de reproducirse; se
+        # hace siempre para no depender de un estado que puede estar desfasado
+        with self._speak_lock:
+            speaking = self._queued_utterances > 0
+            self._generation += 1
         
-        logger.info("Deteniendo reproducción de voz")
+        if speaking:
+            logger.info("Deteniendo reproducción de voz")
         
         # En implementación real: detener reproducción
         
-        # Actualizar estado
-        self._is_speaking = False
-        
         return True
     
     def get_available_voices(self) -> List[Dict[str, Any]]:
@@ -228,30 +532,8 @@ class TtsEngine:
         """
         # En implementación real: obtener lista real de voces
         
-        # Voces simuladas para prototipo
-        return [
-            {
-                "id": "es_female_1",
-                "name": "Carmen",
-                "language": "es",
-                "gender": "female",
-                "quality": "high"
-            },
-            {
-                "id": "es_male_1",
-                "name": "Pablo",
-                "language": "es",
-                "gender": "male",
-                "quality": "high"
-            },
-            {
-                "id": "es_female_2",
-                "name": "Ana",
-                "language": "es",
-                "gender": "female",
-                "quality": "medium"
-            }
-        ]
+        # Diccionarios nuevos: el resultado se serializa para el puente Java
+        return [dict(voice) for voice in _VOICES]
     
     def get_current_state(self) -> Dict[str, Any]:
         """
@@ -262,12 +544,12 @@ class TtsEngine:
         """
         return {
             "initialized": self._is_initialized,
-            "speaking": self._is_speaking,
+            "speaking": self.is_speaking(),
             "current_text": self._current_text,
             "model_path": self.model_path,
             "coqui_available": COQUI_AVAILABLE
         }
 
 
-# Crear instancia global para uso fácil
-tts_engine = TtsEngine()
\ No newline at end of file
+# Instancia global para uso fácil (se crea en el primer uso, no al importar)
+tts_engine = LazyProxy(TtsEngine)
\ No newline at end of file
@@ -5,16 +5,25 @@ Este módulo proporciona la integración con Vosk para reconocimiento de voz
 sin conexión a internet, optimizado para dispositivos Android con recursos limitados.
 """
 
+import io
 import os
+import sys
+import asyncio
 import json
+import math
+import hashlib
+import functools
+import importlib
 import logging
 import threading
 import wave
+from collections import OrderedDict
 import numpy as np
-from typing import Dict, Any, Optional, List, Callable, Union, BinaryIO
+from typing import Dict, Any, Optional, List, Callable, Iterable, Iterator, Literal, Tuple, Union, BinaryIO
 
-# Configuración de logging
-logging.basicConfig(level=logging.DEBUG)
+from .core import LazyProxy
+
+# Logging del módulo (la aplicación que lo usa configura los handlers y el nivel)
 logger = logging.getLogger(__name__)
 
 # Importar Vosk (verificando disponibilidad)
@@ -27,9 +36,457 @@ except ImportError:
     logger.warning("Vosk no está disponible. El reconocimiento offline será limitado.")
     VOSK_AVAILABLE = False
 
+# Decodificar JSON con orjson si está disponible (Vosk devuelve un JSON por fragmento)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Hash del contenido de archivos para la caché de resultados (xxhash si está disponible)
+try:
+    from xxhash import xxh3_64_hexdigest as _content_hash
+except ImportError:
+    def _content_hash(data: bytes) -> str:
+        """Calcula un hash del contenido con blake2b (alternativa a xxhash)."""
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
 # Constantes
+DEMO_MODE = "--demo" in sys.argv  # sys.argv no cambia durante la ejecución: se evalúa una sola vez
 DEFAULT_SAMPLE_RATE = 16000
+FILE_BLOCK_FRAMES = 32000  # Frames por llamada a AcceptWaveform al procesar archivos (2 s a 16 kHz)
+DEFAULT_VAD_THRESHOLD = 300.0  # Energía RMS mínima (int16) para pasar un bloque a Vosk
+RESULT_CACHE_SIZE = 64  # Transcripciones de archivos que se conservan en memoria
+DISK_CACHE_SUFFIX = ".lala.cache.json"  # Transcripción guardada junto a cada archivo
+DISK_CACHE_ENABLED = os.environ.get("LALA_VOSK_CACHE") == "1"  # Para evaluaciones offline repetidas
+STREAM_BLOCK_FRAMES = 4000  # Frames por bloque de micrófono (250 ms a 16 kHz)
+STREAM_QUEUE_SIZE = 8  # Bloques de micrófono pendientes antes de descartar
 DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "models", "vosk", "vosk-model-small-es-0.42")
+QUANTIZED_SUFFIX = "-int8"  # Variante int8 de un modelo: mismo directorio con este sufijo
+DEFAULT_BACKEND = os.environ.get("LALA_VOSK_BACKEND", "vosk")  # "onnx-cuda" en equipos de desarrollo con GPU
+ONNX_MODEL_FILE = "model.onnx"  # Codificador CTC (forma de onda -> logits) dentro del directorio del modelo
+ONNX_VOCAB_FILE = "vocab.json"  # Tokens del codificador CTC (token -> índice)
+ONNX_WORD_DELIMITER = "|"  # Token separador de palabras del vocabulario CTC
+ONNX_BATCH_WINDOWS = 4  # Ventanas de FILE_BLOCK_FRAMES que se decodifican juntas en la GPU
+
+# Modelos Vosk ya cargados, compartidos entre reconocedores (ruta -> Model)
+_MODEL_CACHE: Dict[str, Any] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _optional_module(name: str) -> Optional[Any]:
+    """
+    Importa un módulo opcional la primera vez que se necesita.
+    
+    SciPy, Numba, sounddevice y onnxruntime tardan en importarse: no se cargan
+    al importar este módulo, solo en la ruta que los usa.
+    
+    Args:
+        name: Nombre del módulo (p. ej. "scipy.signal")
+        
+    Returns:
+        Optional[Any]: Módulo importado, o None si no está disponible
+    """
+    try:
+        return importlib.import_module(name)
+    except (ImportError, OSError):
+        # sounddevice lanza OSError si falta PortAudio
+        return None
+
+
+def _rms_loop(samples: np.ndarray) -> float:
+    """
+    Calcula la energía RMS de un bloque de muestras int16 (versión para Numba).
+    
+    Args:
+        samples: Muestras int16
+        
+    Returns:
+        float: Energía RMS en la escala de int16
+    """
+    if len(samples) == 0:
+        return 0.0
+    
+    total = 0.0
+    for value in samples:
+        total += float(value) * float(value)
+    return math.sqrt(total / len(samples))
+
+
+def _preprocess_loop(samples: np.ndarray, start: int, stop: int, up: int, down: int,
+                     bank: np.ndarray, half_len: int, vad_threshold: float) -> Tuple[np.ndarray, bool]:
+    """
+    Remuestrea un bloque de salida y calcula su energía en la misma pasada (versión para Numba).
+    
+    Args:
+        samples: Audio completo de entrada (mono int16)
+        start: Primera muestra de salida del bloque
+        stop: Muestra de salida siguiente a la última del bloque
+        up: Factor de interpolación
+        down: Factor de diezmado
+        bank: Banco polifásico de _polyphase_bank(up, down)
+        half_len: Retardo del filtro en la señal interpolada
+        vad_threshold: Energía RMS mínima para considerar el bloque con voz
+        
+    Returns:
+        Tuple: Bloque remuestreado (int16) y si supera el umbral del VAD
+    """
+    n_in = len(samples)
+    n_phase_taps = bank.shape[1]
+    out = np.empty(stop - start, dtype=np.int16)
+    total = 0.0
+    
+    for n in range(start, stop):
+        # Posición en la señal interpolada (compensando el retardo del filtro):
+        # solo contribuye la fase del filtro que cae sobre muestras de entrada
+        pos = n * down + half_len
+        row = bank[pos % up]
+        base = pos // up
+        
+        acc = 0.0
+        if base < n_in and base >= n_phase_taps - 1:
+            for k in range(n_phase_taps):
+                acc += row[k] * samples[base - k]
+        else:
+            # Bordes del audio: saltar las muestras fuera de rango
+            for k in range(n_phase_taps):
+                i = base - k
+                if 0 <= i < n_in:
+                    acc += row[k] * samples[i]
+        
+        value = min(max(np.rint(acc), -32768.0), 32767.0)
+        out[n - start] = value
+        total += value * value
+    
+    return out, math.sqrt(total / len(out)) >= vad_threshold
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_kernels() -> Optional[Tuple[Callable, Callable]]:
+    """
+    Compila con Numba el cálculo de energía del VAD y el remuestreo en el primer uso.
+    
+    Returns:
+        Optional[Tuple]: (rms, preprocess) compiladas, o None si Numba no está disponible
+    """
+    numba = _optional_module("numba")
+    if numba is None:
+        return None
+    
+    jit = numba.njit(cache=True, fastmath=True)
+    return jit(_rms_loop), jit(_preprocess_loop)
+
+
+def _rms(samples: np.ndarray) -> float:
+    """
+    Calcula la energía RMS de un bloque de muestras int16 (con Numba si está disponible).
+    
+    Args:
+        samples: Muestras int16
+        
+    Returns:
+        float: Energía RMS en la escala de int16
+    """
+    kernels = _numba_kernels()
+    if kernels is not None:
+        return kernels[0](samples)
+    
+    if len(samples) == 0:
+        return 0.0
+    
+    values = samples.astype(np.float64)
+    return math.sqrt(float(np.dot(values, values)) / len(values))
+
+
+@functools.lru_cache(maxsize=8)
+def _polyphase_bank(up: int, down: int) -> Tuple[np.ndarray, int]:
+    """
+    Diseña el filtro paso bajo del remuestreo (como resample_poly) y lo separa por fases.
+    
+    Args:
+        up: Factor de interpolación
+        down: Factor de diezmado
+        
+    Returns:
+        Tuple: Banco (up, coeficientes por fase) con bank[p, k] = h[p + k * up],
+        y el retardo del filtro en la señal interpolada
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    t = np.arange(-half_len, half_len + 1, dtype=np.float64)
+    taps = np.sinc(t / max_rate) * np.kaiser(2 * half_len + 1, 5.0)
+    taps *= up / taps.sum()
+    
+    n_phase_taps = -(-len(taps) // up)
+    padded = np.zeros(up * n_phase_taps)
+    padded[:len(taps)] = taps
+    return np.ascontiguousarray(padded.reshape(n_phase_taps, up).T), half_len
+
+
+def _coerce_pcm(audio_bytes: Union[bytes, bytearray, memoryview], in_sr: int, in_width: int, in_channels: int,
+               out_sr: int = DEFAULT_SAMPLE_RATE) -> bytes:
+    """
+    Convierte audio PCM a mono de 16 bits a la frecuencia del reconocedor.
+    
+    Args:
+        audio_bytes: Audio PCM entrelazado
+        in_sr: Frecuencia de muestreo de entrada en Hz
+        in_width: Bytes por muestra (1, 2 o 4)
+        in_channels: Número de canales
+        out_sr: Frecuencia de muestreo de salida en Hz
+        
+    Returns:
+        bytes: Audio PCM mono int16 a out_sr (el mismo objeto si no hace falta convertir)
+    """
+    if in_width == 2 and in_channels == 1 and in_sr == out_sr:
+        return audio_bytes
+    
+    # Pasar a float32 en la escala de int16 (los WAV de 8 bits no tienen signo)
+    if in_width == 1:
+        samples = (np.frombuffer(audio_bytes, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    elif in_width == 2:
+        samples = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
+    elif in_width == 4:
+        samples = np.frombuffer(audio_bytes, dtype=np.int32).astype(np.float32) / 65536.0
+    else:
+        raise ValueError(f"Ancho de muestra no soportado: {in_width} bytes")
+    
+    # Mezclar canales
+    if in_channels > 1:
+        usable = len(samples) - len(samples) % in_channels
+        samples = samples[:usable].reshape(-1, in_channels).mean(axis=1)
+    
+    # Remuestrear (polifásico con SciPy si está disponible; si no, interpolación lineal)
+    if in_sr != out_sr and len(samples):
+        signal = _optional_module("scipy.signal")
+        if signal is not None:
+            factor = math.gcd(out_sr, in_sr)
+            samples = signal.resample_poly(samples, out_sr // factor, in_sr // factor)
+        else:
+            out_len = int(len(samples) * out_sr / in_sr)
+            samples = np.interp(np.arange(out_len) * (in_sr / out_sr), np.arange(len(samples)), samples)
+    
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16).tobytes()
+
+
+def _pcm_blocks(audio: bytes, vad_threshold: float) -> Iterator[bytes]:
+    """
+    Divide un audio PCM mono int16 en bloques grandes y descarta los de silencio.
+    
+    Args:
+        audio: Audio PCM mono int16 a la frecuencia del reconocedor
+        vad_threshold: Energía RMS mínima de un bloque (0 desactiva el VAD)
+        
+    Returns:
+        Iterator[bytes]: Bloques con voz (AcceptWaveform de Vosk solo acepta bytes)
+    """
+    rms = _rms
+    frombuffer = np.frombuffer
+    int16 = np.int16
+    block_bytes = FILE_BLOCK_FRAMES * 2
+    
+    for offset in range(0, len(audio), block_bytes):
+        data = audio[offset:offset + block_bytes]
+        
+        # Los bloques de silencio no pasan por el modelo
+        if vad_threshold > 0 and rms(frombuffer(data, dtype=int16)) < vad_threshold:
+            continue
+        
+        yield data
+
+
+def _resampled_blocks(audio: bytes, in_sr: int, out_sr: int, vad_threshold: float) -> Iterator[bytes]:
+    """
+    Remuestrea un audio PCM mono int16 por bloques, con el VAD en la misma pasada.
+    
+    Cada bloque de salida se calcula directamente desde el audio de entrada
+    (con el contexto del filtro a ambos lados), sin convertir antes el archivo
+    completo a float ni recorrerlo de nuevo para medir la energía.
+    Requiere Numba; con SciPy disponible es más rápido resample_poly (_coerce_pcm).
+    
+    Args:
+        audio: Audio PCM mono int16 a in_sr
+        in_sr: Frecuencia de muestreo de entrada en Hz
+        out_sr: Frecuencia de muestreo del reconocedor en Hz
+        vad_threshold: Energía RMS mínima de un bloque (0 desactiva el VAD)
+        
+    Returns:
+        Iterator[bytes]: Bloques con voz a out_sr, en PCM int16
+    """
+    samples = np.frombuffer(audio, dtype=np.int16)
+    factor = math.gcd(out_sr, in_sr)
+    up, down = out_sr // factor, in_sr // factor
+    bank, half_len = _polyphase_bank(up, down)
+    preprocess = _numba_kernels()[1]
+    n_out = -(-len(samples) * up // down)
+    
+    for start in range(0, n_out, FILE_BLOCK_FRAMES):
+        block, voiced = preprocess(samples, start, min(start + FILE_BLOCK_FRAMES, n_out),
+                                   up, down, bank, half_len, vad_threshold)
+        if voiced:
+            # AcceptWaveform de Vosk solo acepta bytes
+            yield block.tobytes()
+
+
+def _decode_blocks(recognizer: Any,
+                   blocks: Iterable[bytes]) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Pasa por el reconocedor los bloques de audio de un archivo completo.
+    
+    Bucle caliente de process_audio_file: los métodos y funciones se enlazan
+    a variables locales para no resolver atributos en cada bloque.
+    
+    Args:
+        recognizer: KaldiRecognizer ya reiniciado
+        blocks: Bloques PCM mono int16 que superan el VAD
+        
+    Returns:
+        Tuple: Textos reconocidos, palabras con sus tiempos y resultado final
+    """
+    accept = recognizer.AcceptWaveform
+    get_result = recognizer.Result
+    loads = _loads
+    
+    texts: List[str] = []
+    words: List[Dict[str, Any]] = []
+    add_text = texts.append
+    add_words = words.extend
+    
+    for data in blocks:
+        if accept(data):
+            result = loads(get_result())
+            
+            if result.get("text"):
+                add_text(result["text"])
+            add_words(result.get("result", ()))
+    
+    # Obtener resultado final
+    final = loads(recognizer.FinalResult())
+    
+    if final.get("text"):
+        add_text(final["text"])
+    add_words(final.get("result", ()))
+    
+    return texts, words, final
+
+
+class _OnnxCtcRecognizer:
+    """
+    Decodificador CTC voraz sobre un codificador ONNX, con la interfaz de KaldiRecognizer.
+    
+    Acumula el audio y lo decodifica por lotes de ventanas de FILE_BLOCK_FRAMES
+    en una sola llamada a la sesión; Result() y FinalResult() devuelven el
+    mismo JSON que Vosk para que el resto del reconocedor no cambie.
+    """
+    
+    def __init__(self, session: Any, vocab: Dict[str, int]):
+        """
+        Inicializa el decodificador.
+        
+        Args:
+            session: onnxruntime.InferenceSession del codificador
+            vocab: Vocabulario CTC (token -> índice)
+        """
+        self._session = session
+        self._input_name = session.get_inputs()[0].name
+        self._tokens = np.empty(len(vocab), dtype=object)
+        for token, index in vocab.items():
+            self._tokens[index] = token
+        self._blank_id = vocab.get("<pad>", 0)
+        self._pending: List[np.ndarray] = []
+        self._pending_frames = 0
+        self._last: Dict[str, Any] = {"text": ""}
+    
+    def Reset(self) -> None:
+        """Descarta el audio pendiente para una nueva grabación."""
+        self._pending = []
+        self._pending_frames = 0
+        self._last = {"text": ""}
+    
+    def AcceptWaveform(self, data: bytes) -> bool:
+        """
+        Añade audio PCM mono int16 y decodifica si se completó un lote.
+        
+        Args:
+            data: Audio PCM mono int16
+            
+        Returns:
+            bool: True si hay un resultado nuevo en Result()
+        """
+        # Mismo contrato que KaldiRecognizer: el argumento const char* de cffi solo admite bytes
+        if not isinstance(data, bytes):
+            raise TypeError(f"initializer for ctype 'char *' must be a bytes, not {type(data).__name__}")
+        
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(samples):
+            self._pending.append(samples.astype(np.float32))
+            self._pending_frames += len(samples)
+        
+        if self._pending_frames < ONNX_BATCH_WINDOWS * FILE_BLOCK_FRAMES:
+            return False
+        
+        self._last = self._decode()
+        return True
+    
+    def Result(self) -> str:
+        """Devuelve el último resultado decodificado (JSON de Vosk)."""
+        return json.dumps(self._last, ensure_ascii=False)
+    
+    def PartialResult(self) -> str:
+        """Devuelve el resultado parcial (la decodificación CTC es por lotes)."""
+        return '{"partial": ""}'
+    
+    def FinalResult(self) -> str:
+        """Decodifica el audio pendiente y devuelve el resultado final (JSON de Vosk)."""
+        final = self._decode() if self._pending else {"text": ""}
+        self.Reset()
+        return json.dumps(final, ensure_ascii=False)
+    
+    def _decode(self) -> Dict[str, Any]:
+        """
+        Decodifica el audio pendiente en un único lote.
+        
+        Returns:
+            Dict: Texto reconocido y confianza media de los tokens emitidos
+        """
+        audio = np.concatenate(self._pending)
+        self._pending = []
+        self._pending_frames = 0
+        
+        # Ventanas normalizadas (media 0, varianza 1) y rellenas con ceros hasta FILE_BLOCK_FRAMES
+        n_windows = -(-len(audio) // FILE_BLOCK_FRAMES)
+        batch = np.zeros((n_windows, FILE_BLOCK_FRAMES), dtype=np.float32)
+        batch.reshape(-1)[:len(audio)] = audio
+        valid = np.minimum(len(audio) - np.arange(n_windows) * FILE_BLOCK_FRAMES, FILE_BLOCK_FRAMES)
+        mask = np.arange(FILE_BLOCK_FRAMES) < valid[:, None]
+        mean = batch.sum(axis=1, keepdims=True) / valid[:, None]
+        centered = np.where(mask, batch - mean, 0.0)
+        std = np.sqrt((centered * centered).sum(axis=1, keepdims=True) / valid[:, None] + 1e-7)
+        batch = (centered / std).astype(np.float32)
+        
+        logits = self._session.run(None, {self._input_name: batch})[0]
+        
+        # Descartar las tramas que corresponden al relleno de la última ventana
+        n_steps = logits.shape[1]
+        steps = np.arange(n_steps) < np.ceil(valid * n_steps / FILE_BLOCK_FRAMES)[:, None]
+        logits = logits[steps]
+        
+        # CTC voraz: colapsar repeticiones consecutivas y eliminar el símbolo en blanco
+        ids = logits.argmax(axis=-1)
+        keep = ids != self._blank_id
+        keep[1:] &= ids[1:] != ids[:-1]
+        
+        text = "".join(self._tokens[ids[keep]]).replace(ONNX_WORD_DELIMITER, " ")
+        
+        # Confianza: probabilidad media (softmax) de los tokens emitidos
+        confidence = 0.0
+        if keep.any():
+            emitted = logits[keep]
+            emitted = np.exp(emitted - emitted.max(axis=-1, keepdims=True))
+            confidence = float((emitted.max(axis=-1) / emitted.sum(axis=-1)).mean())
+        
+        return {"text": " ".join(text.split()), "confidence": confidence}
 
 
 class VoskRecognizer:
@@ -41,22 +498,49 @@ class VoskRecognizer:
     """
     
     def __init__(self, model_path: str = DEFAULT_MODEL_PATH, 
-               sample_rate: int = DEFAULT_SAMPLE_RATE):
+               sample_rate: int = DEFAULT_SAMPLE_RATE,
+               vad_threshold: float = DEFAULT_VAD_THRESHOLD,
+               quantized: bool = True,
+               backend: Literal["vosk", "onnx-cuda"] = DEFAULT_BACKEND):
         """
         Inicializa el reconocedor Vosk.
         
         Args:
             model_path: Ruta al modelo Vosk
             sample_rate: Frecuencia de muestreo en Hz
+            vad_threshold: Energía RMS por debajo de la cual un bloque de archivo se descarta (0 para desactivar)
+            quantized: Si es True, usa la variante int8 del modelo cuando está instalada
+            backend: "onnx-cuda" usa el codificador ONNX del modelo en la GPU (si no, Vosk)
         """
+        if backend not in ("vosk", "onnx-cuda"):
+            raise ValueError(f"Backend no soportado: {backend}")
+        
+        # El modelo int8 ocupa menos memoria y ancho de banda en el dispositivo
+        quantized_path = model_path.rstrip("/\\") + QUANTIZED_SUFFIX
+        if quantized and os.path.isdir(quantized_path):
+            model_path = quantized_path
+        
         self.model_path = model_path
         self.sample_rate = sample_rate
+        self.vad_threshold = vad_threshold
+        self.backend = backend
         self.model = None
         self.recognizer = None
         self._is_initialized = False
+        self._ready = False  # Modelo y reconocedor cargados (consultado en cada llamada)
+        
+        # Caché de transcripciones por contenido de archivo (LRU)
+        self._result_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._result_lock = threading.Lock()
+        
+        # Streaming: un único hilo con su bucle asyncio
+        self._streaming = False
+        self._stream_thread: Optional[threading.Thread] = None
+        self._stream_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stream_queue: Optional[asyncio.Queue] = None
         
         # Inicializar automáticamente si está disponible
-        if VOSK_AVAILABLE and os.path.exists(model_path):
+        if (VOSK_AVAILABLE or backend == "onnx-cuda") and os.path.exists(model_path):
             self.initialize()
     
     def initialize(self) -> bool:
@@ -66,8 +550,15 @@ class VoskRecognizer:
         Returns:
             bool: True si se inicializó correctamente
         """
+        # Codificador en la GPU si se pidió y está disponible; si no, Vosk
+        if self.backend == "onnx-cuda":
+            if self._initialize_onnx():
+                return True
+            logger.warning("Backend onnx-cuda no disponible, se usa Vosk")
+            self.backend = "vosk"
+        
         # Verificar si estamos en modo demo o simulado
-        demo_mode = "--demo" in sys.argv
+        demo_mode = DEMO_MODE
         
         if not VOSK_AVAILABLE:
             if demo_mode:
@@ -79,7 +570,7 @@ class VoskRecognizer:
                 return False
         
         if not os.path.exists(self.model_path):
-            logger.error(f"Modelo no encontrado: {self.model_path}")
+            logger.error("Modelo no encontrado: %s", self.model_path)
             if demo_mode:
                 logger.warning("Ejecutando en modo simulado (sin modelo Vosk)")
                 self._is_initialized = True
@@ -87,7 +578,7 @@ class VoskRecognizer:
             return False
         
         try:
-            logger.info(f"Cargando modelo Vosk desde: {self.model_path}")
+            logger.info("Cargando modelo Vosk desde: %s", self.model_path)
             
             # En modo demo, simular la inicialización
             if demo_mode or not os.path.exists(os.path.join(self.model_path, "model")):
@@ -95,20 +586,59 @@ class VoskRecognizer:
                 self._is_initialized = True
                 return True
                 
-            # Inicialización real de Vosk
-            self.model = Model(self.model_path)
+            # Inicialización real de Vosk (el modelo se carga una sola vez por ruta;
+            # Model admite crear KaldiRecognizer desde varios hilos)
+            with _MODEL_LOCK:
+                self.model = _MODEL_CACHE.get(self.model_path)
+                if self.model is None:
+                    self.model = _MODEL_CACHE[self.model_path] = Model(self.model_path)
             self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
             self._is_initialized = True
+            self._ready = True
             logger.info("Reconocedor Vosk inicializado correctamente")
             return True
         
         except Exception as e:
-            logger.error(f"Error al inicializar Vosk: {e}")
+            logger.error("Error al inicializar Vosk: %s", e)
             if demo_mode:
                 logger.warning("Error al inicializar, ejecutando en modo simulado")
                 self._is_initialized = True
                 return True
             self._is_initialized = False
+            self._ready = False
+            return False
+    
+    def _initialize_onnx(self) -> bool:
+        """
+        Carga el codificador ONNX del modelo con el proveedor CUDA.
+        
+        Returns:
+            bool: True si la sesión y el vocabulario se cargaron
+        """
+        ort = _optional_module("onnxruntime")
+        if ort is None or "CUDAExecutionProvider" not in ort.get_available_providers():
+            return False
+        
+        onnx_path = os.path.join(self.model_path, ONNX_MODEL_FILE)
+        vocab_path = os.path.join(self.model_path, ONNX_VOCAB_FILE)
+        if not (os.path.isfile(onnx_path) and os.path.isfile(vocab_path)):
+            return False
+        
+        try:
+            logger.info("Cargando codificador ONNX desde: %s", onnx_path)
+            with open(vocab_path, encoding="utf-8") as f:
+                vocab = json.load(f)
+            
+            session = ort.InferenceSession(onnx_path, providers=["CUDAExecutionProvider"])
+            self.model = session
+            self.recognizer = _OnnxCtcRecognizer(session, vocab)
+            self._is_initialized = True
+            self._ready = True
+            logger.info("Reconocedor ONNX (CUDA) inicializado correctamente")
+            return True
+        
+        except Exception as e:
+            logger.error("Error al inicializar el backend ONNX: %s", e)
             return False
     
     def is_initialized(self) -> bool:
@@ -118,11 +648,16 @@ class VoskRecognizer:
         Returns:
             bool: Estado de inicialización
         """
-        return self._is_initialized and self.model is not None and self.recognizer is not None
+        return self._ready
     
     def reset(self) -> None:
         """Reinicia el reconocedor para una nueva grabación."""
-        if self.is_initialized():
+        if not self.is_initialized():
+            return
+        
+        if isinstance(self.recognizer, _OnnxCtcRecognizer):
+            self.recognizer.Reset()
+        else:
             self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
     
     def process_audio_file(self, audio_file_path: str) -> Dict[str, Any]:
@@ -142,63 +677,152 @@ class VoskRecognizer:
             return {"success": False, "error": f"Archivo no encontrado: {audio_file_path}"}
         
         try:
-            # Reiniciar el reconocedor
-            self.reset()
+            # Leer el archivo una sola vez: sirve para la clave de caché y para decodificarlo
+            with open(audio_file_path, "rb") as f:
+                raw = f.read()
             
-            # Abrir archivo WAV
-            wf = wave.open(audio_file_path, "rb")
+            # Un archivo ya transcrito con la misma configuración no pasa por Vosk
+            cache_key = (_content_hash(raw), self.sample_rate, self.vad_threshold, self.backend)
+            with self._result_lock:
+                cached = self._result_cache.get(cache_key)
+                if cached is not None:
+                    self._result_cache.move_to_end(cache_key)
+                    logger.debug("Transcripción obtenida de la caché: %s", audio_file_path)
+                    return dict(cached)
             
-            # Verificar formato
-            if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
-                return {
-                    "success": False,
-                    "error": "Formato de audio no soportado. Usar WAV mono 16-bit PCM."
-                }
+            # Transcripción guardada en disco por una ejecución anterior
+            if DISK_CACHE_ENABLED:
+                cached = self._load_disk_cache(audio_file_path, cache_key[0])
+                if cached is not None:
+                    logger.debug("Transcripción obtenida de la caché en disco: %s", audio_file_path)
+                    return cached
             
-            # Procesar en fragmentos
-            results = []
+            # Reiniciar el reconocedor
+            self.reset()
             
-            while True:
-                data = wf.readframes(4000)  # 4000 frames = 250ms a 16kHz
-                if len(data) == 0:
-                    break
+            # Abrir archivo WAV
+            with wave.open(io.BytesIO(raw), "rb") as wf:
+                # Verificar formato (otros anchos, canales y frecuencias se convierten)
+                if wf.getsampwidth() not in (1, 2, 4) or wf.getcomptype() != "NONE":
+                    return {
+                        "success": False,
+                        "error": "Formato de audio no soportado. Usar WAV PCM sin comprimir de 8, 16 o 32 bits."
+                    }
                 
-                if self.recognizer.AcceptWaveform(data):
-                    result_json = self.recognizer.Result()
-                    result = json.loads(result_json)
-                    
-                    if "text" in result and result["text"]:
-                        results.append(result["text"])
+                # Leer todo el audio de una vez
+                frames = wf.readframes(wf.getnframes())
+                framerate, sampwidth, channels = wf.getframerate(), wf.getsampwidth(), wf.getnchannels()
             
-            # Obtener resultado final
-            final_json = self.recognizer.FinalResult()
-            final = json.loads(final_json)
+            # Mono 16-bit a otra frecuencia sin SciPy pero con Numba: remuestreo y VAD
+            # fusionados por bloque. En otro caso (resample_poly es más rápido que el
+            # núcleo fusionado), convertir a mono 16-bit de una vez si hace falta
+            if (sampwidth == 2 and channels == 1 and framerate != self.sample_rate
+                    and _optional_module("scipy.signal") is None and _numba_kernels() is not None):
+                blocks = _resampled_blocks(frames, framerate, self.sample_rate, self.vad_threshold)
+            else:
+                audio = _coerce_pcm(frames, framerate, sampwidth, channels, self.sample_rate)
+                blocks = _pcm_blocks(audio, self.vad_threshold)
             
-            if "text" in final and final["text"]:
-                results.append(final["text"])
+            # Procesar en bloques grandes
+            results, words, final = _decode_blocks(self.recognizer, blocks)
             
             # Consolidar resultado
             text = " ".join(results).strip()
             
-            return {
+            result = {
                 "success": True,
                 "text": text,
                 "confidence": final.get("confidence", 0.0),
                 "partial": False
             }
+            
+            with self._result_lock:
+                self._result_cache[cache_key] = dict(result)
+                while len(self._result_cache) > RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+            
+            if DISK_CACHE_ENABLED:
+                self._save_disk_cache(audio_file_path, cache_key[0], result, words)
+            
+            return result
         
         except Exception as e:
-            logger.error(f"Error al procesar archivo de audio: {e}")
+            logger.error("Error al procesar archivo de audio: %s", e)
             return {"success": False, "error": str(e)}
     
+    def _load_disk_cache(self, audio_file_path: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Lee la transcripción guardada junto a un archivo de audio.
+        
+        Args:
+            audio_file_path: Ruta al archivo de audio (WAV)
+            content_hash: Hash del contenido actual del archivo
+            
+        Returns:
+            Optional[Dict]: Resultado guardado, o None si no existe, no es válido o está desactualizado
+        """
+        try:
+            with open(audio_file_path + DISK_CACHE_SUFFIX, "rb") as f:
+                cached = _loads(f.read())
+        except (OSError, ValueError):
+            return None
+        
+        # El hash invalida la caché aunque el archivo se sustituya conservando su fecha
+        if (not isinstance(cached, dict)
+                or cached.get("hash") != content_hash
+                or cached.get("model_path") != self.model_path
+                or cached.get("sample_rate") != self.sample_rate
+                or cached.get("vad_threshold") != self.vad_threshold
+                or cached.get("backend", "vosk") != self.backend):
+            return None
+        
+        return {
+            "success": True,
+            "text": cached.get("text", ""),
+            "confidence": cached.get("confidence", 0.0),
+            "partial": False
+        }
+    
+    def _save_disk_cache(self, audio_file_path: str, content_hash: str,
+                       result: Dict[str, Any], words: List[Dict[str, Any]]) -> None:
+        """
+        Guarda una transcripción junto a su archivo de audio.
+        
+        Args:
+            audio_file_path: Ruta al archivo de audio (WAV)
+            content_hash: Hash del contenido del archivo
+            result: Resultado del reconocimiento
+            words: Palabras reconocidas con sus tiempos y confianzas (si Vosk las da)
+        """
+        try:
+            with open(audio_file_path + DISK_CACHE_SUFFIX, "w", encoding="utf-8") as f:
+                json.dump({
+                    "hash": content_hash,
+                    "model_path": self.model_path,
+                    "sample_rate": self.sample_rate,
+                    "vad_threshold": self.vad_threshold,
+                    "backend": self.backend,
+                    "text": result["text"],
+                    "confidence": result["confidence"],
+                    "words": words
+                }, f, ensure_ascii=False)
+        except OSError as e:
+            logger.warning("No se pudo guardar la caché de transcripción: %s", e)
+    
     def process_audio_data(self, audio_data: Union[bytes, bytearray, memoryview, BinaryIO],
-                         is_final: bool = False) -> Dict[str, Any]:
+                         is_final: bool = False,
+                         sample_rate: Optional[int] = None,
+                         sample_width: int = 2,
+                         channels: int = 1) -> Dict[str, Any]:
         """
         Procesa datos de audio en memoria.
         
         Args:
             audio_data: Datos de audio (bytes)
             is_final: Si es True, solicita resultado final
+            sample_rate: Frecuencia de muestreo de los datos (None si ya coincide con la del reconocedor)
+            sample_width: Bytes por muestra de los datos
+            channels: Número de canales de los datos
             
         Returns:
             Dict: Resultado del reconocimiento
@@ -208,22 +832,27 @@ class VoskRecognizer:
         
         try:
             # Procesar datos
-            if isinstance(audio_data, (bytearray, memoryview)) or hasattr(audio_data, 'read'):
-                # Si es un archivo o buffer, convertir a bytes si es necesario
-                if hasattr(audio_data, 'read'):
-                    audio_bytes = audio_data.read()
-                else:
-                    audio_bytes = bytes(audio_data)
+            if hasattr(audio_data, 'read'):
+                # Si es un archivo, leer su contenido
+                audio_bytes = audio_data.read()
             else:
-                # Ya es bytes
                 audio_bytes = audio_data
             
+            # Convertir a mono 16-bit a la frecuencia del reconocedor si hace falta
+            if sample_rate is not None or sample_width != 2 or channels != 1:
+                audio_bytes = _coerce_pcm(audio_bytes, sample_rate or self.sample_rate,
+                                          sample_width, channels, self.sample_rate)
+            
+            # AcceptWaveform (cffi, const char*) solo acepta bytes: copiar bytearray y memoryview
+            if not isinstance(audio_bytes, bytes):
+                audio_bytes = bytes(audio_bytes)
+            
             # Resultado parcial o final
             if is_final:
                 # Obtener resultado final
                 self.recognizer.AcceptWaveform(audio_bytes)
                 final_json = self.recognizer.FinalResult()
-                final = json.loads(final_json)
+                final = _loads(final_json)
                 
                 text = final.get("text", "")
                 confidence = final.get("confidence", 0.0)
@@ -239,7 +868,7 @@ class VoskRecognizer:
                 if self.recognizer.AcceptWaveform(audio_bytes):
                     # Hay un resultado intermedio completo
                     result_json = self.recognizer.Result()
-                    result = json.loads(result_json)
+                    result = _loads(result_json)
                     
                     text = result.get("text", "")
                     confidence = result.get("confidence", 0.0)
@@ -253,7 +882,7 @@ class VoskRecognizer:
                 else:
                     # Resultado parcial
                     partial_json = self.recognizer.PartialResult()
-                    partial = json.loads(partial_json)
+                    partial = _loads(partial_json)
                     
                     text = partial.get("partial", "")
                     
@@ -265,7 +894,7 @@ class VoskRecognizer:
                     }
         
         except Exception as e:
-            logger.error(f"Error al procesar datos de audio: {e}")
+            logger.error("Error al procesar datos de audio: %s", e)
             return {"success": False, "error": str(e)}
     
     def start_streaming(self, callback: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
@@ -281,15 +910,85 @@ class VoskRecognizer:
         if not self.is_initialized():
             return {"success": False, "error": "Reconocedor no inicializado"}
         
-        # Reiniciar el reconocedor
+        # Detener un streaming anterior y reiniciar el reconocedor
+        self.stop_streaming()
         self.reset()
         
-        # En una implementación real, aquí se iniciaría un hilo para
-        # capturar audio continuamente y pasarlo al reconocedor
+        sd = _optional_module("sounddevice")
+        if sd is None:
+            # Sin captura de micrófono (en Android el audio llega por process_audio_data)
+            logger.warning("sounddevice no está disponible, streaming simulado")
+            return {"success": True, "message": "Streaming iniciado"}
+        
+        # Captura y reconocimiento en un solo hilo con su propio bucle asyncio
+        self._streaming = True
+        self._stream_thread = threading.Thread(
+            target=asyncio.run,
+            args=(self._stream(sd, callback),),
+            daemon=True
+        )
+        self._stream_thread.start()
         
-        # Para este prototipo, simular inicio exitoso
         return {"success": True, "message": "Streaming iniciado"}
     
+    async def _stream(self, sd: Any, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Bucle de streaming: recibe bloques del micrófono y los reconoce.
+        
+        Args:
+            sd: Módulo sounddevice
+            callback: Función a llamar con cada resultado
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self._stream_loop = loop
+        self._stream_queue = queue
+        
+        def on_audio(indata, frames, time_info, status) -> None:
+            # Hilo de PortAudio: solo copiar el bloque y pasarlo al bucle
+            loop.call_soon_threadsafe(self._offer, queue, bytes(indata))
+        
+        try:
+            with sd.RawInputStream(samplerate=self.sample_rate, blocksize=STREAM_BLOCK_FRAMES,
+                                   dtype="int16", channels=1, callback=on_audio):
+                while self._streaming:
+                    data = await queue.get()
+                    if data is None:
+                        break
+                    
+                    # AcceptWaveform libera el GIL: se ejecuta fuera del bucle
+                    result = await loop.run_in_executor(None, self.process_audio_data, data)
+                    
+                    try:
+                        callback(result)
+                    except Exception as e:
+                        logger.error("Error en callback de streaming: %s", e)
+        
+        except Exception as e:
+            logger.error("Error en streaming de audio: %s", e)
+        
+        finally:
+            # Un callback puede haber iniciado ya otro streaming: no tocar su estado
+            if self._stream_thread in (None, threading.current_thread()):
+                self._streaming = False
+                self._stream_loop = None
+                self._stream_queue = None
+    
+    @staticmethod
+    def _offer(queue: asyncio.Queue, data: Optional[bytes]) -> None:
+        """
+        Encola un bloque de streaming, descartándolo si la cola está llena.
+        
+        Args:
+            queue: Cola del bucle de streaming
+            data: Bloque de audio (None para despertar al bucle y terminar)
+        """
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # El reconocimiento va retrasado; un bucle ocupado ya verá la señal de parada
+            logger.debug("Cola de streaming llena, bloque de audio descartado")
+    
     def stop_streaming(self) -> Dict[str, Any]:
         """
         Detiene reconocimiento en tiempo real.
@@ -297,11 +996,28 @@ class VoskRecognizer:
         Returns:
             Dict: Resultado de detención de streaming
         """
-        # En una implementación real, aquí se detendría el hilo de captura
+        self._streaming = False
+        
+        # Despertar al bucle si está esperando audio
+        loop, queue = self._stream_loop, self._stream_queue
+        if loop is not None and queue is not None:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, None)
+            except RuntimeError:
+                pass  # El bucle ya terminó
+        
+        thread = self._stream_thread
+        if thread is not None:
+            # Desde un callback de resultados se está en el propio hilo de streaming:
+            # no puede esperarse a sí mismo, terminará al volver del callback
+            if thread is not threading.current_thread():
+                thread.join(timeout=2.0)
+                if thread.is_alive():
+                    logger.warning("El hilo de streaming no terminó a tiempo")
+            self._stream_thread = None
         
-        # Para este prototipo, simular detención exitosa
         return {"success": True, "message": "Streaming detenido"}
 
 
-# Crear instancia global para uso fácil
-recognizer = VoskRecognizer()
\ No newline at end of file
+# Instancia global para uso fácil (se crea en el primer uso, no al importar)
+recognizer = LazyProxy(VoskRecognizer)
\ No newline at end of file